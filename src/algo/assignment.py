@@ -0,0 +1,194 @@
+
+import typing
+
+import numpy as np
+
+
+# called after every augmentation with (augmentations, rows, columns, row potentials, column potentials),
+# in the orientation of the input matrix
+PotentialsCallback = typing.Callable[[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray], None]
+
+
+def solve_assignment(cost: np.ndarray, maximize: bool = False,
+                     on_row: PotentialsCallback | None = None) -> tuple[np.ndarray, np.ndarray, float]:
+    # Kuhn-Munkres with shortest augmenting paths and row / column potentials, O(n^2 m) for n <= m,
+    # every search step updates all the columns at once.
+    # returns the rows, the assigned columns and the total cost, like scipy linear_sum_assignment
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError("the cost must be a matrix")
+    if not np.all(np.isfinite(cost)):
+        raise ValueError("the costs must be finite")
+
+    # the smaller side is the rows, so every row is assigned
+    transposed = cost.shape[0] > cost.shape[1]
+    c = cost.T if transposed else cost
+    if maximize:
+        c = -c
+    n, m = c.shape
+
+    u = np.zeros(n)
+    v = np.zeros(m)
+    col_row = np.full(m, -1, dtype=np.int64)
+    way = np.zeros(m, dtype=np.int64)
+    minv = np.empty(m)
+    used = np.empty(m, dtype=bool)
+    row_used = np.empty(n, dtype=bool)
+
+    for i in range(n):
+        # dijkstra from the row i over the reduced costs, until a free column is reached
+        minv.fill(np.inf)
+        used.fill(False)
+        row_used.fill(False)
+        row_used[i] = True
+
+        i0 = i
+        j0 = -1
+        while True:
+            cur = c[i0] - u[i0] - v
+            better = (cur < minv) & ~used
+            minv[better] = cur[better]
+            way[better] = j0
+
+            masked = np.where(used, np.inf, minv)
+            j1 = int(np.argmin(masked))
+            delta = masked[j1]
+
+            u[row_used] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+
+            used[j1] = True
+            j0 = j1
+            if col_row[j0] < 0:
+                break
+            i0 = col_row[j0]
+            row_used[i0] = True
+
+        # flip the path back to the row i
+        while j0 >= 0:
+            j1 = way[j0]
+            col_row[j0] = col_row[j1] if j1 >= 0 else i
+            j0 = j1
+
+        if on_row is not None:
+            cols = np.flatnonzero(col_row >= 0)
+            if transposed:
+                on_row(i + 1, cols, col_row[cols], v, u)
+            else:
+                on_row(i + 1, col_row[cols], cols, u, v)
+
+    cols = np.flatnonzero(col_row >= 0)
+    rows = col_row[cols]
+    order = np.argsort(rows)
+    rows, cols = rows[order], cols[order]
+
+    if transposed:
+        rows, cols = cols, rows
+        order = np.argsort(rows)
+        rows, cols = rows[order], cols[order]
+
+    return rows, cols, float(cost[rows, cols].sum())
+
+
+def solve_assignment_batch(cost: np.ndarray, maximize: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # solve_assignment for a stack of matrices of the same shape (batch, n, m), every search step is done at once
+    # for all the instances that are still searching. the potentials are updated once per augmentation from the
+    # shortest path costs, like in scipy linear_sum_assignment.
+    # returns the rows and the columns as (batch, min(n, m)) arrays, and the total cost of every instance
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 3:
+        raise ValueError("the cost must be a stack of matrices")
+    if not np.all(np.isfinite(cost)):
+        raise ValueError("the costs must be finite")
+
+    transposed = cost.shape[1] > cost.shape[2]
+    c = cost.transpose(0, 2, 1) if transposed else cost
+    if maximize:
+        c = -c
+    c = np.ascontiguousarray(c)
+    batch, n, m = c.shape
+
+    u = np.zeros((batch, n))
+    v = np.zeros((batch, m))
+    row_col = np.full((batch, n), -1, dtype=np.int64)
+    col_row = np.full((batch, m), -1, dtype=np.int64)
+
+    costs = np.empty((batch, m))
+    path = np.empty((batch, m), dtype=np.int64)
+    col_used = np.empty((batch, m), dtype=bool)
+    row_used = np.empty((batch, n), dtype=bool)
+    min_value = np.empty(batch)
+    i = np.empty(batch, dtype=np.int64)
+    sink = np.empty(batch, dtype=np.int64)
+    every = np.arange(batch)
+
+    for row in range(n):
+        costs.fill(np.inf)
+        col_used.fill(False)
+        row_used.fill(False)
+        min_value.fill(0)
+        i.fill(row)
+
+        # the instances that did not reach a free column yet
+        active = every
+        while len(active) > 0:
+            # while all the instances are searching, the state is updated in place
+            full = len(active) == batch
+            rows = i[active]
+            row_used[active, rows] = True
+
+            reduced = min_value[active][:, None] + c[active, rows] - u[active, rows][:, None] - v[active]
+            if full:
+                better = (reduced < costs) & ~col_used
+                np.copyto(costs, reduced, where=better)
+                np.copyto(path, rows[:, None], where=better)
+                masked = np.where(col_used, np.inf, costs)
+            else:
+                active_costs = costs[active]
+                better = (reduced < active_costs) & ~col_used[active]
+                active_costs = np.where(better, reduced, active_costs)
+                costs[active] = active_costs
+                path[active] = np.where(better, rows[:, None], path[active])
+                masked = np.where(col_used[active], np.inf, active_costs)
+
+            j = np.argmin(masked, axis=1)
+            min_value[active] = masked[np.arange(len(active)), j]
+
+            next_rows = col_row[active, j]
+            found = next_rows < 0
+            sink[active[found]] = j[found]
+
+            searching = ~found
+            col_used[active[searching], j[searching]] = True
+            i[active[searching]] = next_rows[searching]
+            active = active[searching]
+
+        # the potentials of the visited rows and columns
+        u[:, row] += min_value
+        row_used[:, row] = False
+        u += np.where(row_used, min_value[:, None] - np.take_along_axis(costs, np.maximum(row_col, 0), axis=1), 0)
+        v -= np.where(col_used, min_value[:, None] - costs, 0)
+
+        # flip the paths of all the instances together, one edge of every path at a time
+        j = sink
+        flipping = every
+        while len(flipping) > 0:
+            cols = j[flipping]
+            rows = path[flipping, cols]
+            col_row[flipping, cols] = rows
+            j[flipping] = row_col[flipping, rows]
+            row_col[flipping, rows] = cols
+            flipping = flipping[rows != row]
+
+    rows = np.broadcast_to(np.arange(n), (batch, n)).copy()
+    cols = row_col
+
+    if transposed:
+        rows, cols = cols, rows
+        order = np.argsort(rows, axis=1, kind='stable')
+        rows = np.take_along_axis(rows, order, axis=1)
+        cols = np.take_along_axis(cols, order, axis=1)
+
+    totals = cost[every[:, None], rows, cols].sum(axis=1)
+    return rows, cols, totals
@@ -0,0 +1,226 @@
+
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# the bids of the bidders are split between the workers only when there are enough of them
+MIN_PARALLEL_BIDDERS = 4096
+
+# with fewer bidders than this they bid one after the other, a vectorized round costs more than a few single bids
+MIN_VECTOR_BIDDERS = 32
+
+# the arrays that the worker attached to, by the name of the shared memory
+worker_arrays: dict[str, tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+def attach(name: str, dtype: np.dtype, size: int) -> np.ndarray:
+    if name not in worker_arrays:
+        shm = shared_memory.SharedMemory(name=name)
+        worker_arrays[name] = (shm, np.ndarray((size,), dtype=dtype, buffer=shm.buf))
+    return worker_arrays[name][1]
+
+
+def share(array: np.ndarray) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[:] = array
+    return shm, shared
+
+
+def bid(bidders: np.ndarray, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, prices: np.ndarray,
+        epsilon: float, spread: float) -> tuple[np.ndarray, np.ndarray]:
+    # the edge of the best object of every bidder and its bid, the price that makes it as good as the second best
+    # object plus epsilon
+    starts = indptr[bidders]
+    lengths = indptr[bidders + 1] - starts
+    segments = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    # the positions of the edges of all the bidders, one segment per bidder
+    positions = np.repeat(starts - segments, lengths) + np.arange(lengths.sum())
+    objects = indices[positions]
+    values = weights[positions] - prices[objects]
+
+    best = np.maximum.reduceat(values, segments)
+    is_best = values == np.repeat(best, lengths)
+    first = np.minimum.reduceat(np.where(is_best, np.arange(len(values)), len(values)), segments)
+    best_objects = objects[first]
+    best_positions = positions[first]
+
+    values[first] = -np.inf
+    second = np.maximum.reduceat(values, segments)
+    # a bidder with one object bids as if the second object is worse by the spread of the weights
+    second = np.where(np.isfinite(second), second, best - spread)
+
+    return best_positions, prices[best_objects] + best - second + epsilon
+
+
+def bid_one(i: int, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, prices: np.ndarray,
+            epsilon: float, spread: float) -> tuple[int, float]:
+    # bid for a single bidder
+    start, end = indptr[i], indptr[i + 1]
+    values = weights[start:end] - prices[indices[start:end]]
+    k = int(values.argmax())
+    best = values[k]
+    values[k] = -np.inf
+    second = values.max() if end - start > 1 else best - spread
+    return start + k, prices[indices[start + k]] + best - second + epsilon
+
+
+def worker_bid(names: tuple[str, str, str, str], sizes: tuple[int, int, int, int], bidders: np.ndarray,
+               epsilon: float, spread: float) -> tuple[np.ndarray, np.ndarray]:
+    indptr = attach(names[0], np.dtype(np.int64), sizes[0])
+    indices = attach(names[1], np.dtype(np.int64), sizes[1])
+    weights = attach(names[2], np.dtype(np.float64), sizes[2])
+    prices = attach(names[3], np.dtype(np.float64), sizes[3])
+    return bid(bidders, indptr, indices, weights, prices, epsilon, spread)
+
+
+def dual_gap(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, prices: np.ndarray,
+             row_position: np.ndarray) -> float:
+    # the bound of the prices and the best profit of every row, minus the benefit of the assignment
+    profits = np.maximum.reduceat(weights - prices[indices], indptr[:-1])
+    return float(prices.sum() + profits.sum() - weights[row_position].sum())
+
+
+def solve_auction(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, cols: int, maximize: bool = True,
+                  epsilon: float | None = None, scaling: float = 4.0, workers: int = 0) -> tuple[np.ndarray, float, float]:
+    # epsilon scaling auction for sparse assignment, the edges of the row i are indices[indptr[i]:indptr[i + 1]]
+    # with weights[indptr[i]:indptr[i + 1]]. every row can also stay unassigned, so maximize finds a max weight
+    # matching and min finds a min cost matching of max size. the unassigned rows bid together in every round,
+    # until only a few are left.
+    # returns the column of every row (-1 when unassigned), the objective and the gap from the dual bound
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    rows = len(indptr) - 1
+    if rows == 0:
+        return np.zeros(0, dtype=np.int64), 0.0, 0.0
+
+    if maximize:
+        benefits = weights
+    else:
+        # an edge is always better than staying unassigned, so the matching has max size
+        big = np.abs(weights).sum() + 1
+        benefits = big - weights
+
+    # every row gets a private dummy column cols + i with benefit 0 after its edges, for staying unassigned
+    lengths = np.diff(indptr)
+    ext_indptr = np.concatenate(([0], np.cumsum(lengths + 1)))
+    ext_indices = np.empty(len(indices) + rows, dtype=np.int64)
+    ext_weights = np.zeros(len(indices) + rows)
+    is_edge = np.ones(len(ext_indices), dtype=bool)
+    is_edge[ext_indptr[1:] - 1] = False
+    ext_indices[is_edge] = indices
+    ext_indices[~is_edge] = cols + np.arange(rows)
+    ext_weights[is_edge] = benefits
+    size = cols + rows
+
+    spread = float(ext_weights.max() - ext_weights.min()) + 1
+    integral = bool(np.all(np.equal(np.mod(ext_weights, 1), 0)))
+    if epsilon is None:
+        # with integer weights epsilon below 1 / rows gives the optimum
+        epsilon = 1 / (rows + 1) if integral else max(spread, 1) * 1e-9
+
+    pool = None
+    shared = []
+    prices = np.zeros(size)
+    if workers > 1 and rows >= MIN_PARALLEL_BIDDERS:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        shared = [share(ext_indptr), share(ext_indices), share(ext_weights), share(prices)]
+        prices = shared[3][1]
+        names = tuple(shm.name for shm, _ in shared)
+        sizes = tuple(len(array) for _, array in shared)
+
+    try:
+        row_position = np.full(rows, -1, dtype=np.int64)
+        owners = np.full(size, -1, dtype=np.int64)
+
+        starts = ext_indptr[:-1]
+        current = max(spread / 2, epsilon)
+        bidders = np.arange(rows)
+        while True:
+            while len(bidders) > 0:
+                if len(bidders) < MIN_VECTOR_BIDDERS:
+                    # the end of the phase is mostly chains of one bidder that takes the object of the next one
+                    queue = bidders.tolist()
+                    while len(queue) > 0:
+                        i = queue.pop()
+                        position, price = bid_one(i, ext_indptr, ext_indices, ext_weights, prices, current, spread)
+                        j = ext_indices[position]
+                        if owners[j] >= 0:
+                            row_position[owners[j]] = -1
+                            queue.append(owners[j])
+                        row_position[i] = position
+                        owners[j] = i
+                        prices[j] = price
+                    break
+
+                if pool is not None and len(bidders) >= MIN_PARALLEL_BIDDERS:
+                    chunks = np.array_split(bidders, workers)
+                    results = list(pool.map(worker_bid, [names] * len(chunks), [sizes] * len(chunks), chunks,
+                                            [current] * len(chunks), [spread] * len(chunks)))
+                    positions = np.concatenate([result[0] for result in results])
+                    bids = np.concatenate([result[1] for result in results])
+                else:
+                    positions, bids = bid(bidders, ext_indptr, ext_indices, ext_weights, prices, current, spread)
+                objects = ext_indices[positions]
+
+                # the highest bid for every object wins
+                order = np.lexsort((-bids, objects))
+                first = np.concatenate(([True], objects[order][1:] != objects[order][:-1]))
+                winners = order[first]
+                won = objects[winners]
+
+                outbid = owners[won]
+                outbid = outbid[outbid >= 0]
+                row_position[outbid] = -1
+
+                row_position[bidders[winners]] = positions[winners]
+                owners[won] = bidders[winners]
+                prices[won] = bids[winners]
+
+                losers = np.ones(len(bidders), dtype=bool)
+                losers[winners] = False
+                bidders = np.concatenate((bidders[losers], outbid))
+
+            # the objects that are left unassigned go back to price 0, then the prices are a bound of the optimum.
+            # with integer weights a gap below 1 is already the optimum
+            prices[owners < 0] = 0
+            gap = dual_gap(ext_indptr, ext_indices, ext_weights, prices, row_position)
+            if current <= epsilon or gap < (1 if integral else rows * epsilon):
+                break
+            current = max(current / scaling, epsilon)
+
+            # there are more objects than rows, so the unassigned objects are kept at price 0 like at the start,
+            # and the next phase keeps the assignments that are still within the smaller epsilon from the best profit.
+            # an unassigned row can free an object, so it is repeated until nothing changes
+            bidders = np.zeros(0, dtype=np.int64)
+            while True:
+                prices[owners < 0] = 0
+                profits = np.maximum.reduceat(ext_weights - prices[ext_indices], starts)
+                assigned = np.flatnonzero(row_position >= 0)
+                positions = row_position[assigned]
+                violating = assigned[ext_weights[positions] - prices[ext_indices[positions]] < profits[assigned] - current]
+                if len(violating) == 0:
+                    break
+                owners[ext_indices[row_position[violating]]] = -1
+                row_position[violating] = -1
+                bidders = np.concatenate((bidders, violating))
+
+        # the row i has i dummy columns before its edges
+        assigned = np.flatnonzero(is_edge[row_position])
+        edge_positions = row_position[assigned] - assigned
+        row_col = np.full(rows, -1, dtype=np.int64)
+        row_col[assigned] = indices[edge_positions]
+
+        return row_col, float(weights[edge_positions].sum()), gap
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            for shm, _ in shared:
+                shm.close()
+                shm.unlink()
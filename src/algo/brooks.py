@@ -1,28 +1,37 @@
 import typing
 
+from array import array
+
 import networkx as nx
 
 import matplotlib
 
-from src.infra.algo import Algo
-from src.infra.step import PlotStep, DrawReturn
+from src.infra.algo import Algo, RecordMode
+from src.infra.csr import CSRGraph
+from src.infra.renderer import GraphStyle
+from src.infra.step import StyledStep
+from src.tracker.trace import Trace
 
 
 Node = typing.Any
 
 
 # steps
-class NodesColoringGraphStep(PlotStep):
-    def __init__(self, graph: nx.Graph, colors_assigned: dict[Node, int]) -> None:
-        self.graph = graph.copy()
-        self.colors_assigned = colors_assigned.copy()
+class NodesColoringGraphStep(StyledStep):
+    def __init__(self, trace: Trace, index: int) -> None:
+        self.trace = trace
+        self.index = index
+
+    def style(self) -> GraphStyle:
+        snapshot = self.trace.get(self.index)
+        graph = snapshot.graph
+        colors_assigned = snapshot.node_states
 
-    def draw(self) -> DrawReturn:
-        max_color = max([0] + [self.colors_assigned[v] for v in self.colors_assigned]) + 1
-        node_color = [NodesColoringGraphStep.get_color(v, max_color, self.colors_assigned) for v in self.graph.nodes()]
-        nx.draw_networkx(self.graph, node_color=node_color)
+        max_color = max([0] + [colors_assigned[v] for v in colors_assigned]) + 1
+        node_color = [NodesColoringGraphStep.get_color(v, max_color, colors_assigned) for v in graph.nodes()]
+        text = "Nodes: {}, Max Color: {}".format(len(list(graph.nodes())), max_color)
 
-        return None, "Nodes: {}, Max Color: {}".format(len(list(self.graph.nodes())), max_color)
+        return GraphStyle(graph, self.layout(graph), node_color=node_color, text=text)
 
     @staticmethod
     def get_color(node: typing.Any, max_color: int, colors_assigned: dict[typing.Any, int]) -> typing.Any:
@@ -38,7 +47,8 @@ class NodesColoringGraphStep(PlotStep):
 # algo
 class BrooksAlgo(Algo):
     def run(self, graph: nx.Graph, args: dict) -> dict[Node, int]:
-        draw = 'draw' not in args or args['draw']
+        if 'draw' in args and not args['draw']:
+            self.set_record_mode(RecordMode.OFF)
 
         colors_assigned = {}
 
@@ -47,61 +57,47 @@ class BrooksAlgo(Algo):
             component_colors_assigned = self.brooks_algorithm_connected(component)
             colors_assigned.update(component_colors_assigned)
 
-        if draw:
-            self.add_step(NodesColoringGraphStep(graph, colors_assigned))
+        trace = self.start_trace(graph)
+        for v in colors_assigned:
+            trace.node_state(v, colors_assigned[v])
+        self.add_step(self.frame_step(NodesColoringGraphStep), keyframe=True)
 
         return colors_assigned
 
-    def bfs(self, graph: nx.Graph, s: Node) -> nx.Graph:
-        visited = set()
-        toVisit = [s]
-
-        bfs_graph = nx.DiGraph()
-        bfs_graph.add_node(s)
-
-        while len(toVisit) > 0:
-            v = toVisit.pop(0)
-            visited.add(v)
-            for w in graph.neighbors(v):
-                if (w not in toVisit) and (w not in visited):
-                    toVisit = [w] + toVisit
-                    bfs_graph.add_node(w)
-                    bfs_graph.add_edge(v, w)
-
-        return bfs_graph
-
-    def get_components(self, graph: nx.Graph) -> set[nx.Graph]:
-        graph = graph.copy()
-        components: set[nx.Graph] = set()
-
-        nodes = list(graph.nodes())
-        while len(nodes) > 0:
-            s = nodes[0]
-            component_nodes = self.bfs(graph, s).nodes()
-
+    def get_components(self, graph: nx.Graph) -> list[nx.Graph]:
+        # one BFS over the integer indexed adjacency, every component is built from its own rows of the adjacency
+        # (a subgraph view filters every neighbor it reads, again on every degree and neighbors call)
+        csr = CSRGraph(graph)
+        order, start = csr.components()
+        if len(start) <= 2:
+            return [graph] if len(csr) > 0 else []
+
+        nodes, indptr, indices = csr.nodes, csr.indptr, csr.indices
+        components = []
+        for c in range(len(start) - 1):
+            vertices = order[start[c]:start[c + 1]]
             component = nx.Graph()
-            component.add_nodes_from(component_nodes)
-            for v in component_nodes:
-                for w in component_nodes:
-                    if graph.has_edge(v, w):
-                        component.add_edge(v, w)
-                        graph.remove_edge(v, w)
-
-            graph.remove_nodes_from(component_nodes)
-
-            components.add(component)
-
-            nodes = list(graph.nodes())
+            component.add_nodes_from([nodes[i] for i in vertices])
+            component.add_edges_from([(nodes[i], nodes[j]) for i in vertices
+                                      for j in indices[indptr[i]:indptr[i + 1]] if i <= j])
+            components.append(component)
 
         return components
 
+    @staticmethod
+    def get_subgraph(graph: nx.Graph, nodes: list[Node]) -> nx.Graph:
+        # a plain graph of the nodes, like the components it is read once from the adjacency instead of being a view
+        keep = set(nodes)
+        adj = graph.adj
+        subgraph = nx.Graph()
+        subgraph.add_nodes_from(nodes)
+        subgraph.add_edges_from([(v, w) for v in nodes for w in adj[v] if w in keep])
+        return subgraph
+
     def color_graph(self, graph: nx.Graph, order: list[Node]) -> dict[Node, int]:
         colors_assigned = {}
         for v in order:
-            neighbors_colors = []
-            for w in graph.neighbors(v):
-                if w in colors_assigned:
-                    neighbors_colors.append(colors_assigned[w])
+            neighbors_colors = {colors_assigned[w] for w in graph.neighbors(v) if w in colors_assigned}
             color = 0
             while color in neighbors_colors:
                 color += 1
@@ -145,35 +141,94 @@ class BrooksAlgo(Algo):
 
         return self.color_graph(graph, order)
 
-    def get_spinning_tree_order(self, tree: nx.Graph, root: Node) -> list[Node]:
-        order = []
-
-        tree = tree.copy()
-
-        leaves = [v for (v, val) in tree.degree() if val == 1 and v != root]
-        while len(leaves) > 0:
-            order = order + leaves
-            tree.remove_nodes_from(leaves)
-            leaves = [v for (v, val) in tree.degree() if val == 1 and v != root]
-
-        return order + [root]
-
-    def find_vertex_cut(self, graph: nx.Graph) -> tuple[Node, set[nx.Graph]] | None:
-        for v in graph.nodes():
-            g = graph.copy()
-            g.remove_node(v)
-            components = self.get_components(g)
-            if len(components) > 1:
-                return v, components
-
-        return None
+    def get_spinning_tree_order(self, graph: nx.Graph, root: Node) -> list[Node]:
+        # the BFS order of the connected graph from root reversed, every vertex comes before its parent in the
+        # BFS tree so it still has an uncolored neighbor when it is colored, and the root is last
+        csr = CSRGraph(graph)
+        order = csr.bfs(csr.index[root])
+        return [csr.nodes[i] for i in reversed(order)]
+
+    def find_vertex_cut(self, graph: nx.Graph) -> list[tuple[Node, list[Node]]] | None:
+        # the blocks of the connected graph by one tarjan DFS, as the block-cut tree from its root down. every block
+        # comes with the vertex it shares with the blocks before it, the root of the DFS for the first block.
+        # None when the graph has no cut vertex
+        csr = CSRGraph(graph)
+        indptr, indices = csr.indptr, csr.indices
+        n = len(csr)
+        if n == 0:
+            return None
+
+        disc = array('q', [-1]) * n
+        low = array('q', [0]) * n
+        parent = array('q', [-1]) * n
+        next_edge = indptr[:-1]
+
+        disc[0] = 0
+        counter = 1
+        stack = [0]
+        visited = [0]
+        blocks = []
+        while len(stack) > 0:
+            v = stack[-1]
+            if next_edge[v] < indptr[v + 1]:
+                w = indices[next_edge[v]]
+                next_edge[v] += 1
+                if disc[w] == -1:
+                    disc[w] = low[w] = counter
+                    counter += 1
+                    parent[w] = v
+                    stack.append(w)
+                    visited.append(w)
+                elif w != parent[v] and disc[w] < low[v]:
+                    low[v] = disc[w]
+                continue
+
+            stack.pop()
+            if len(stack) > 0:
+                u = stack[-1]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+                if low[v] >= disc[u]:
+                    # nothing in the subtree of v goes above u, so the subtree and u are a block
+                    block = [u]
+                    while block[-1] != v:
+                        block.append(visited.pop())
+                    blocks.append((u, block))
+
+        if len(blocks) <= 1:
+            return None
+
+        # a block is found before the block above it
+        blocks.reverse()
+        return [(csr.nodes[top], [csr.nodes[w] for w in block]) for top, block in blocks]
 
     def find_x_y_z(self, graph: nx.Graph) -> tuple[Node, Node, Node] | None:
-        for x in graph.nodes():
-            for y in graph.neighbors(x):
-                for z in graph.neighbors(x):
-                    if y != z and not graph.has_edge(z, y):
-                        return x, y, z
+        # x with the non adjacent neighbors y and z, such that graph - [y, z] is connected.
+        # the graph is 2-connected, k-regular with k >= 3 and not full connected
+        x = next(iter(graph.nodes()))
+        blocks = self.find_vertex_cut(self.get_subgraph(graph, [v for v in graph.nodes() if v != x]))
+
+        if blocks is None:
+            # graph - x is 2-connected, so y at distance 2 from x and z = x are fine, with their common neighbor
+            for u in graph.neighbors(x):
+                for y in graph.neighbors(u):
+                    if y != x and not graph.has_edge(x, y):
+                        return u, y, x
+            return None
+
+        # x has a neighbor in every leaf block of graph - x that is not a cut vertex of graph - x,
+        # two such neighbors are not adjacent and removing them keeps the graph connected
+        root = blocks[0][0]
+        cut_vertices = {top for top, block in blocks[1:]}
+        if sum(1 for top, block in blocks if top == root) > 1:
+            cut_vertices.add(root)
+
+        leaves = []
+        for top, block in blocks:
+            if sum(1 for v in block if v in cut_vertices) == 1:
+                leaves.append(next(v for v in block if v not in cut_vertices and graph.has_edge(x, v)))
+                if len(leaves) == 2:
+                    return x, leaves[0], leaves[1]
         return None
 
     def brooks_algorithm_connected(self, graph: nx.Graph) -> dict[Node, int]:
@@ -205,30 +260,24 @@ class BrooksAlgo(Algo):
         if not is_k_regular:
             # A: create spinning tree T from graph
             s = [node for (node, val) in graph.degree() if val != max_degree][0]
-            spinning_tree = self.bfs(graph, s)
-            order = self.get_spinning_tree_order(spinning_tree, s)
+            order = self.get_spinning_tree_order(graph, s)
             return self.color_graph(graph, order)
 
         # is k-regular
         # B: check if exists cut size of graph is 1
-        res = self.find_vertex_cut(graph)
-        if res is not None:
-            # B.A: separate into graphs from the cut
-            # B.A: solve the g1 and g2 parts as not k-regular solver
-            s, components = res
+        blocks = self.find_vertex_cut(graph)
+        if blocks is not None:
+            # B.A: every block has a cut vertex with a smaller degree, so it is solved as not k-regular
+            # B.A: from the root of the block-cut tree down, the colors of a block are swapped so its cut vertex
+            # keeps the color it got in the block above
             components_colored = {}
-            for component in components:
-                component.add_node(s)
-                component.add_edges_from([(s, v) for v in graph.neighbors(s) if v in component.nodes()])
-                component_colored = self.brooks_algorithm_connected(component)
-
-                # B.A: replace so the color of s be same (or simply 0)
-                color_of_s = component_colored[s]
-                if color_of_s != 0:
-                    has_zero = [node for node in component.nodes if component_colored[node] == 0]
-                    has_s_color = [node for node in component.nodes if component_colored[node] == color_of_s]
-                    component_colored.update({node: color_of_s for node in has_zero})
-                    component_colored.update({node: 0 for node in has_s_color})
+            for s, block in blocks:
+                component_colored = self.brooks_algorithm_connected(self.get_subgraph(graph, block))
+
+                if s in components_colored and component_colored[s] != components_colored[s]:
+                    color_of_s, target = component_colored[s], components_colored[s]
+                    swap = {color_of_s: target, target: color_of_s}
+                    component_colored = {node: swap.get(color, color) for node, color in component_colored.items()}
 
                 components_colored.update(component_colored)
 
@@ -240,10 +289,8 @@ class BrooksAlgo(Algo):
         x, y, z = self.find_x_y_z(graph)
 
         # B.B: create spinning tree T from graph - [y,z]
-        graph_mis = graph.copy()
-        graph_mis.remove_nodes_from([y, z])
-        spinning_tree = self.bfs(graph_mis, x)
-        # B.B: order = [y,z] + order from T by levels of leaves of T
-        order = [y, z] + self.get_spinning_tree_order(spinning_tree, x)
+        graph_mis = self.get_subgraph(graph, [v for v in graph.nodes() if v != y and v != z])
+        # B.B: order = [y,z] + order from T with the root x last
+        order = [y, z] + self.get_spinning_tree_order(graph_mis, x)
         # B.B: return by greedy with order
         return self.color_graph(graph, order)
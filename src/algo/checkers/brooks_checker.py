@@ -0,0 +1,58 @@
+# checker for brooks algo
+
+from functools import partial
+
+import networkx as nx
+
+from src.infra.algo import AlgoChecker
+from src.infra.renderer import GraphStyle
+from src.infra.step import StyledStep
+from src.algo.brooks import NodesColoringGraphStep
+
+
+# steps
+class ColoringStep(StyledStep):
+    def __init__(self, graph: nx.Graph, colors_assigned: dict, text: str) -> None:
+        self.graph = graph.copy()
+        self.colors_assigned = colors_assigned.copy()
+        self.text = text
+
+    def style(self) -> GraphStyle:
+        max_color = max([0] + [self.colors_assigned[v] for v in self.colors_assigned]) + 1
+        node_color = [NodesColoringGraphStep.get_color(v, max_color, self.colors_assigned) for v in self.graph.nodes()]
+        return GraphStyle(self.graph, self.layout(self.graph), node_color=node_color, text=self.text)
+
+
+# algo checker
+class BrooksAlgoChecker(AlgoChecker):
+    def checker(self, graph: nx.Graph, arg: dict, colors_assigned: dict):
+        missing = [v for v in graph.nodes() if v not in colors_assigned]
+        if len(missing) > 0:
+            self.add_step(partial(ColoringStep, graph, colors_assigned, "{} nodes are not colored!".format(len(missing))),
+                          keyframe=True)
+            return colors_assigned
+
+        conflicts = [(v, w) for v, w in graph.edges() if v != w and colors_assigned[v] == colors_assigned[w]]
+        if len(conflicts) > 0:
+            self.add_step(partial(ColoringStep, graph, colors_assigned, "{} edges have the same color on both sides!".format(
+                len(conflicts))), keyframe=True)
+            return colors_assigned
+
+        # brooks: a connected graph needs at most max degree colors, unless it is full connected or an odd cycle
+        for nodes in nx.connected_components(graph):
+            component = graph.subgraph(nodes)
+            n = len(nodes)
+            max_degree = max([val for (node, val) in component.degree()])
+            is_full_connected = component.number_of_edges() == n * (n - 1) // 2
+            is_odd_cycle = max_degree == 2 and n % 2 == 1 and component.number_of_edges() == n
+            bound = max_degree + 1 if is_full_connected or is_odd_cycle else max_degree
+
+            count = len(set([colors_assigned[v] for v in nodes]))
+            if count > bound:
+                self.add_step(partial(ColoringStep, graph, colors_assigned, "A component of max degree {} got {} colors!".format(
+                    max_degree, count)), keyframe=True)
+                return colors_assigned
+
+        max_color = max([0] + [colors_assigned[v] + 1 for v in colors_assigned])
+        self.add_step(partial(ColoringStep, graph, colors_assigned, "Colored with {} colors".format(max_color)), keyframe=True)
+        return colors_assigned
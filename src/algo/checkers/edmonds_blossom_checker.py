@@ -2,39 +2,71 @@
 
 import random
 
+from functools import partial
+
 import networkx as nx
 
 from src.infra.algo import AlgoChecker
-from src.infra.step import PlotStep, DrawReturn
-from src.algo.tests.lib.max_matching import get_max_matching, is_matching
+from src.infra.matching import Matching
+from src.infra.renderer import GraphStyle
+from src.infra.step import StyledStep
+from src.algo.tests.lib.max_matching import get_matching_weight, get_max_matching, get_max_weight, is_matching
+
+
+# networkx takes seconds on a component of this many edges, larger ones are only checked to be a matching
+MAX_EXACT_WEIGHTED_EDGES = 2000
 
 
 # steps
-class MatchingStep(PlotStep):
-    def __init__(self, graph: nx.Graph, matching: list[set[int]], text: str) -> None:
+class MatchingStep(StyledStep):
+    def __init__(self, graph: nx.Graph, matching: Matching, text: str) -> None:
         self.graph = graph.copy()
         self.matching = matching.copy()
         self.text = text
 
-    def draw(self) -> DrawReturn:
-        edge_color = [("r" if (set(list(e)) in self.matching) else "b") for e in self.graph.edges()]
-        nx.draw_networkx(self.graph, edge_color=edge_color)
-
-        return None, self.text
+    def style(self) -> GraphStyle:
+        edge_color = [("r" if self.matching.contains(v, w) else "b") for v, w in self.graph.edges()]
+        return GraphStyle(self.graph, self.layout(self.graph), edge_color=edge_color, text=self.text)
 
 
 # algo checker
 class EdmondsBlossomAlgoChecker(AlgoChecker):
-    def checker(self, graph: nx.Graph, arg: dict, matching: list[set[int]]):
+    def checker(self, graph: nx.Graph, arg: dict, matching: Matching):
         if not is_matching(graph, matching):
-            self.add_step(MatchingStep(graph, matching, "Is not matching!"))
+            self.add_step(partial(MatchingStep, graph, matching, "Is not matching!"), keyframe=True)
             return matching
 
+        if 'weighted' in arg and arg['weighted']:
+            return self.check_weighted(graph, arg, matching)
+
         max_matching = get_max_matching(graph)
 
         if len(matching) != max_matching:
-            self.add_step(MatchingStep(graph, matching, "Got {} but the max matching is {}!".format(len(matching), max_matching)))
+            self.add_step(partial(MatchingStep, graph, matching, "Got {} but the max matching is {}!".format(len(matching), max_matching)),
+                          keyframe=True)
+            return matching
+
+        self.add_step(partial(MatchingStep, graph, matching, "The max matching is {}".format(len(matching))), keyframe=True)
+        return matching
+
+    def check_weighted(self, graph: nx.Graph, arg: dict, matching: Matching):
+        # against the matching of networkx, with the same weight and the same size when maxcardinality
+        weight = arg['weight'] if 'weight' in arg else 'weight'
+        maxcardinality = 'maxcardinality' in arg and arg['maxcardinality']
+        total = get_matching_weight(graph, matching, weight)
+
+        largest = max((graph.subgraph(nodes).number_of_edges() for nodes in nx.connected_components(graph)), default=0)
+        if largest > MAX_EXACT_WEIGHTED_EDGES:
+            self.add_step(partial(MatchingStep, graph, matching, "Matching of {} with weight {}, too large to check the max".format(
+                len(matching), total)), keyframe=True)
+            return matching
+
+        max_weight, max_size = get_max_weight(graph, maxcardinality, weight)
+
+        if abs(total - max_weight) > 1e-9 * max(1, abs(max_weight)) or (maxcardinality and len(matching) != max_size):
+            self.add_step(partial(MatchingStep, graph, matching, "Got {} of weight {} but the max is {} of weight {}!".format(
+                len(matching), total, max_size, max_weight)), keyframe=True)
             return matching
 
-        self.add_step(MatchingStep(graph, matching, "The max matching is {}".format(len(matching))))
+        self.add_step(partial(MatchingStep, graph, matching, "The max weight matching is {}".format(max_weight)), keyframe=True)
         return matching
@@ -0,0 +1,88 @@
+# checker for hungarian algo
+
+from functools import partial
+
+import networkx as nx
+
+from src.infra.algo import AlgoChecker, RecordMode
+from src.infra.matching import Matching
+from src.infra.step import GraphStep
+from src.algo.hungarian import HungarianAlgo
+from src.algo.checkers.edmonds_blossom_checker import MatchingStep
+from src.algo.tests.lib.max_matching import get_matching_weight, get_max_matching, is_matching
+
+
+# algo checker
+class HungarianAlgoChecker(AlgoChecker):
+    def checker(self, graph: nx.Graph, arg: dict, res):
+        if 'batch' in arg:
+            return self.check_batch(graph, arg, res)
+        if 'edits' in arg:
+            return self.check_dynamic(graph, arg, res)
+
+        return res
+
+    def check_batch(self, graph: nx.Graph, arg: dict, matchings: list[Matching | None]):
+        # every graph of the batch against its own solve_assignment, or its max matching without assignment
+        assignment = arg['assignment'] if 'assignment' in arg and arg['assignment'] else None
+        weight = arg['weight'] if 'weight' in arg else 'weight'
+
+        for k, (instance, matching) in enumerate(zip(arg['batch'], matchings)):
+            if matching is None:
+                if len(instance.nodes()) > 0 and HungarianAlgo.get_sides(instance) is not None:
+                    self.add_step(partial(GraphStep, instance, "Graph {} is bipartite but was not solved!".format(k)), keyframe=True)
+                    return matchings
+                continue
+
+            if not is_matching(instance, matching):
+                self.add_step(partial(MatchingStep, instance, matching, "Graph {} got a pair that is not an edge!".format(k)),
+                              keyframe=True)
+                return matchings
+
+            if assignment is None:
+                expected = Matching()
+                expected_size = get_max_matching(instance)
+            else:
+                algo = HungarianAlgo(RecordMode.OFF)
+                expected = algo.run(instance, {'assignment': assignment, 'weight': weight})
+                expected_size = len(expected)
+
+            total = get_matching_weight(instance, matching, weight)
+            expected_total = get_matching_weight(instance, expected, weight)
+            # a max weight matching can have any size, the others are max matchings
+            same_size = assignment == 'max' or len(matching) == expected_size
+            same_total = assignment is None or abs(total - expected_total) <= 1e-9 * max(1, abs(expected_total))
+            if not same_size or not same_total:
+                self.add_step(partial(MatchingStep, instance, matching, "Graph {} got {} of weight {} but expected {} of weight {}!".format(
+                    k, len(matching), total, expected_size, expected_total)), keyframe=True)
+                return matchings
+
+        self.add_step(partial(GraphStep, graph, "Solved {} graphs in one batch".format(len(matchings))), keyframe=True)
+        return matchings
+
+    def check_dynamic(self, graph: nx.Graph, arg: dict, matchings: list[Matching] | None):
+        # the edits are applied again to a copy of the graph, after every edit the matching is a max matching of it
+        if matchings is None:
+            return matchings
+
+        graph = graph.copy()
+        for i, ((op, v, w), matching) in enumerate(zip(arg['edits'], matchings)):
+            if op == 'add':
+                graph.add_edge(v, w)
+            else:
+                graph.remove_edge(v, w)
+
+            if not is_matching(graph, matching):
+                self.add_step(partial(MatchingStep, graph, matching, "Edit {} left a pair that is not an edge!".format(i)),
+                              keyframe=True)
+                return matchings
+
+            max_matching = get_max_matching(graph)
+            if len(matching) != max_matching:
+                self.add_step(partial(MatchingStep, graph, matching, "Edit {} got {} but the max matching is {}!".format(
+                    i, len(matching), max_matching)), keyframe=True)
+                return matchings
+
+        self.add_step(partial(MatchingStep, graph, matchings[-1] if len(matchings) > 0 else Matching(),
+                              "The max matching is kept over {} edits".format(len(matchings))), keyframe=True)
+        return matchings
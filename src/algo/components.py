@@ -0,0 +1,127 @@
+
+import multiprocessing
+import typing
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.infra.csr import CSRGraph
+
+
+# solves one component given as its number of vertices, its edges over the local indexes 0..n-1 and their weights
+# (None when unweighted), returns the mate of every local vertex or -1
+ComponentSolver = typing.Callable[[int, array, array, list | None], list[int]]
+
+# with fewer edges than this the pool costs more than it saves
+MIN_PARALLEL_EDGES = 100000
+
+# the components are packed into about this many chunks per worker, so a few large ones do not hold back the pool
+CHUNKS_PER_WORKER = 4
+
+
+# the pool is kept between the calls, so its processes are spawned only once
+pool: ProcessPoolExecutor | None = None
+pool_workers = 0
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    global pool, pool_workers
+    if pool is None or pool_workers != workers:
+        if pool is not None:
+            pool.shutdown()
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        pool_workers = workers
+    return pool
+
+
+def close_pool() -> None:
+    global pool
+    if pool is not None:
+        pool.shutdown()
+        pool = None
+
+
+def solve_chunk(solver: ComponentSolver, sizes: array, edge_counts: array, heads: array, tails: array,
+                weights: list | None) -> array:
+    # the components one after the other, returns their local mates in the same order
+    mates = array('q')
+    k = 0
+    for i in range(len(sizes)):
+        end = k + edge_counts[i]
+        mates.extend(solver(sizes[i], heads[k:end], tails[k:end], weights[k:end] if weights is not None else None))
+        k = end
+    return mates
+
+
+def solve_components(n: int, heads: array, tails: array, weights: list | None, solver: ComponentSolver,
+                     workers: int = 0, min_parallel_edges: int = MIN_PARALLEL_EDGES) -> list[int]:
+    # a max matching is the union of the max matchings of the connected components, so every component is solved
+    # alone over its own compact arrays, on a process pool when workers > 1 and there are at least
+    # min_parallel_edges edges. returns the mate of every vertex or -1
+    order, start = CSRGraph.from_edges(n, heads, tails).components()
+    count = len(start) - 1
+
+    # the component of every vertex and its index in the component
+    component = array('q', [0]) * n
+    local = array('q', [0]) * n
+    for c in range(count):
+        for i in range(start[c], start[c + 1]):
+            component[order[i]] = c
+            local[order[i]] = i - start[c]
+
+    # the edges grouped by component
+    edge_start = array('q', [0]) * (count + 1)
+    for v in heads:
+        edge_start[component[v] + 1] += 1
+    for c in range(count):
+        edge_start[c + 1] += edge_start[c]
+    position = edge_start[:-1]
+    edge_order = array('q', [0]) * len(heads)
+    for k in range(len(heads)):
+        c = component[heads[k]]
+        edge_order[position[c]] = k
+        position[c] += 1
+
+    # consecutive components with edges are packed into chunks of about the same number of edges
+    parallel = workers > 1 and len(heads) >= min_parallel_edges
+    target = len(heads) // (workers * CHUNKS_PER_WORKER) if parallel else len(heads)
+    chunks = []
+    chunk_components = []
+    c = 0
+    while c < count:
+        first = c
+        while c < count and (c == first or edge_start[c] - edge_start[first] < target):
+            c += 1
+        components = [i for i in range(first, c) if edge_start[i + 1] > edge_start[i]]
+        if len(components) == 0:
+            continue
+
+        sizes = array('q', [start[i + 1] - start[i] for i in components])
+        edge_counts = array('q', [edge_start[i + 1] - edge_start[i] for i in components])
+        ks = edge_order[edge_start[first]:edge_start[c]]
+        chunk_heads = array('q', [local[heads[k]] for k in ks])
+        chunk_tails = array('q', [local[tails[k]] for k in ks])
+        chunk_weights = [weights[k] for k in ks] if weights is not None else None
+        chunks.append((sizes, edge_counts, chunk_heads, chunk_tails, chunk_weights))
+        chunk_components.append(components)
+
+    if parallel and len(chunks) > 1:
+        try:
+            results = list(get_pool(workers).map(solve_chunk, [solver] * len(chunks), *zip(*chunks)))
+        except BrokenProcessPool:
+            # a pool whose process died can not be used again, the next call starts a new one
+            close_pool()
+            raise
+    else:
+        results = [solve_chunk(solver, *chunk) for chunk in chunks]
+
+    mate = [-1] * n
+    for components, mates in zip(chunk_components, results):
+        j = 0
+        for c in components:
+            for i in range(start[c], start[c + 1]):
+                if mates[j] != -1:
+                    mate[order[i]] = order[start[c] + mates[j]]
+                j += 1
+    return mate
@@ -1,76 +1,156 @@
 
+from functools import partial
+
 import networkx as nx
 
-from src.infra.algo import Algo
-from src.infra.step import GraphStep, PlotStep, DrawReturn
+from src.infra.algo import ResumableAlgo, StepGenerator
+from src.infra.csr import CSRGraph
+from src.infra.renderer import GraphStyle
+from src.infra.step import GraphStep, StyledStep
+from src.tracker.snapshot import Snapshot, edge_key
+from src.tracker.trace import Trace
 
 
 # steps
-class DFSStep(PlotStep):
-    def __init__(self, graph: nx.Graph, current: int, tree: dict[int, int | None], explored: list[int], to_explore: list[int]) -> None:
-        self.current = current
-        self.tree = tree.copy()
-        self.graph = graph.copy()
-        self.explored = explored.copy()
-        self.to_explore = to_explore.copy()
+class DFSStep(StyledStep):
+    def __init__(self, trace: Trace, index: int) -> None:
+        self.trace = trace
+        self.index = index
+
+    def style(self) -> GraphStyle:
+        snapshot = self.trace.get(self.index)
+        graph = snapshot.graph
 
-    def draw(self) -> DrawReturn:
-        text = "Explored: {}, To Explore {}".format(str(len(self.explored)), str(len(self.to_explore)))
+        to_explore = set(snapshot.frontier)
 
         node_color = []
-        for node in self.graph.nodes():
-            if node == self.current:
+        for node in graph.nodes():
+            if node == snapshot.current:
                 node_color.append('r')
-            elif node in self.explored:
+            elif snapshot.node_states.get(node) == 'explored':
                 node_color.append('g')
-            elif node in self.to_explore:
+            elif node in to_explore:
                 node_color.append('b')
             else:
                 node_color.append('#888888')
 
         edge_color = []
-        for e in self.graph.edges():
-            v, w = e
-            if (v in self.tree and self.tree[v] == w) or (w in self.tree and self.tree[w] == v):
+        for v, w in graph.edges():
+            if snapshot.edge_states.get(edge_key(v, w)) == 'tree':
                 edge_color.append('g')
             else:
                 edge_color.append('#888888')
 
-        nx.draw_networkx(self.graph, node_color=node_color, edge_color=edge_color)
+        return GraphStyle(graph, self.layout(graph), node_color, edge_color, snapshot.text)
+
 
-        return None, text
+# the search between two steps, copied by the checkpoints of a lazy tracker
+class DFSState:
+    def __init__(self, graph: nx.Graph, csr: CSRGraph) -> None:
+        self.graph = graph
+        self.csr = csr
+        self.dfs_tree: dict[int, int | None] = {}
+        # a node is marked when it is pushed, so every node is pushed once
+        self.visited = bytearray(len(csr))
+        # the top of the stack is the last item
+        self.to_explore: list[int] = []
+        self.explored = 0
+
+    def copy(self) -> 'DFSState':
+        state = DFSState(self.graph, self.csr)
+        state.dfs_tree = self.dfs_tree.copy()
+        state.visited = self.visited[:]
+        state.to_explore = self.to_explore.copy()
+        state.explored = self.explored
+        return state
 
 
 # the algo
-class DFSAlgo(Algo):
+class DFSAlgo(ResumableAlgo):
+    state: DFSState | None = None
+
     def run(self, graph: nx.Graph, args: dict) -> dict[int, int | None] | None:
+        return self.drain(self.generate(graph, args))
+
+    def generate(self, graph: nx.Graph, args: dict) -> StepGenerator:
+        self.state = None
+
         if len(graph.nodes()) == 0:
-            self.get_tracker().add_step(GraphStep(graph, "Is Empty graph!"))
+            yield from self.emit(partial(GraphStep, graph, "Is Empty graph!"), keyframe=True)
             return
 
-        if not nx.is_connected(graph):
-            self.get_tracker().add_step(GraphStep(graph, "Is Not Connected!"))
+        # the graph is indexed once, so the search works on integers
+        csr = CSRGraph(graph)
+
+        if not csr.is_connected():
+            yield from self.emit(partial(GraphStep, graph, "Is Not Connected!"), keyframe=True)
             return
 
-        self.add_step(GraphStep(graph))
+        yield from self.emit(partial(GraphStep, graph), keyframe=True)
 
-        s = list(graph.nodes())[0]
+        s = 0
+        state = DFSState(graph, csr)
+        state.dfs_tree[csr.nodes[s]] = None
+        state.visited[s] = 1
+        state.to_explore.append(s)
 
-        dfs_tree: dict[int, int | None] = {s: None}
+        self.start_trace(graph).push(csr.nodes[s])
+        self.state = state
 
-        explored = []
-        to_explore = [s]
+        return (yield from self.search())
 
-        while len(to_explore) > 0:
-            v = to_explore.pop(0)
-            explored += [v]
+    def checkpoint(self) -> tuple[DFSState, Snapshot | None] | None:
+        if self.state is None:
+            return None
+        if not self.is_recording(keyframe=True):
+            return self.state.copy(), None
 
-            add = [w for w in graph.neighbors(v) if w not in explored + to_explore]
-            for w in add:
-                dfs_tree[w] = v
+        # the trace goes on from the state of the checkpoint, which is kept as the base of a resumed trace
+        self.trace = self.trace.rebase()
+        return self.state.copy(), self.trace.base
 
-            to_explore = add + to_explore
+    def resume(self, checkpoint: tuple[DFSState, Snapshot | None]) -> StepGenerator:
+        state, base = checkpoint
+        self.state = state.copy()
+        if self.is_recording(keyframe=True):
+            self.trace = Trace(state.graph, base=base)
+        return self.search()
 
-            self.add_step(DFSStep(graph, v, dfs_tree, explored, to_explore))
+    def search(self) -> StepGenerator:
+        state = self.state
+        nodes, indptr, indices = state.csr.nodes, state.csr.indptr, state.csr.indices
+        visited, to_explore, dfs_tree = state.visited, state.to_explore, state.dfs_tree
+        recording = self.is_recording(keyframe=True)
+
+        while len(to_explore) > 0:
+            v = to_explore.pop()
+            state.explored += 1
+
+            add = []
+            for w in indices[indptr[v]:indptr[v + 1]]:
+                if not visited[w]:
+                    visited[w] = 1
+                    add.append(w)
+                    dfs_tree[nodes[w]] = nodes[v]
+
+            # the first neighbor is explored first
+            to_explore.extend(reversed(add))
+
+            if recording:
+                # the trace is read on every step, it is replaced when it is rebased
+                trace = self.trace
+                trace.pop()
+                trace.current(nodes[v])
+                trace.node_state(nodes[v], 'explored')
+                for w in reversed(add):
+                    trace.edge_state((nodes[v], nodes[w]), 'tree')
+                    trace.push(nodes[w])
+                trace.text("Explored: {}, To Explore {}".format(str(state.explored), str(len(to_explore))))
+
+                yield from self.emit(self.frame_step(DFSStep), keyframe=len(to_explore) == 0)
+
+                # the steps that are kept by a lazy tracker keep only the events of their own part of the trace
+                if trace.needs_rebase():
+                    self.trace = trace.rebase()
 
         return dfs_tree
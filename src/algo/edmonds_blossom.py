@@ -1,202 +1,342 @@
 import typing
 
+from array import array
+from functools import partial
+
 import networkx as nx
 
-from src.infra.algo import Algo
-from src.infra.step import PlotStep, DrawReturn
+from src.algo.components import solve_components
+from src.algo.warm_start import warm_start
+from src.algo.weighted_blossom import WeightedBlossom
+from src.infra.algo import Algo, RecordMode
+from src.infra.csr import CSRGraph
+from src.infra.matching import Matching
+from src.infra.renderer import GraphStyle
+from src.infra.step import StyledStep
+from src.tracker.snapshot import edge_key
+from src.tracker.trace import Trace
 
 
 Node = typing.Any
-BlossomParams = tuple[Node, Node, dict[Node, Node | None]]
-
-
-# steps
-class MatchingStep(PlotStep):
-    def __init__(self, graph: nx.Graph, matching: list[set[int]], text: str = "", augmenting_path: list | None = None) -> None:
-        self.graph = graph.copy()
-        self.matching = matching.copy()
-        self.text = text
-        self.augmenting_path = augmenting_path
+BlossomCallback = typing.Callable[[list[int], list[int], int], None]
 
-    def draw(self) -> DrawReturn:
-        augmenting_path = []
-        if self.augmenting_path is not None:
-            augmenting_path = [{self.augmenting_path[i-1], self.augmenting_path[i]} for i in range(1, len(self.augmenting_path))]
+# the labels of the vertices in the alternating tree
+UNREACHED = 0
+EVEN = 1
+ODD = 2
 
-        colors = {e: 'b' for e in self.graph.edges()}
-        colors.update({e: 'r' for e in self.graph.edges() if set(list(e)) in self.matching})
-        colors.update({e: 'g' for e in self.graph.edges() if set(list(e)) in augmenting_path})
 
-        node_color = [colors[e] for e in self.graph.edges()]
-        nx.draw_networkx(self.graph, edge_color=node_color)
+# steps
+class MatchingStep(StyledStep):
+    def __init__(self, trace: Trace, index: int) -> None:
+        self.trace = trace
+        self.index = index
+
+    def style(self) -> GraphStyle:
+        snapshot = self.trace.get(self.index)
+        graph = snapshot.graph
+
+        colors = {'path': 'g', 'matched': 'r', 'blossom': 'm'}
+        edge_color = [colors.get(snapshot.edge_states.get(edge_key(v, w)), 'b') for v, w in graph.edges()]
+
+        return GraphStyle(graph, self.layout(graph), edge_color=edge_color, text=snapshot.text)
+
+
+class BlossomSearch:
+    # alternating forest search over an integer indexed graph, the blossoms are never built. every vertex points to the
+    # base of its blossom by a union find, and the state of the last phase is reset only for the vertices it reached
+    def __init__(self, csr: CSRGraph, mate: list[int]) -> None:
+        n = len(csr)
+        self.indptr = csr.indptr
+        self.indices = csr.indices
+        self.mate = mate
+
+        self.base = list(range(n))
+        self.label = bytearray(n)
+        self.pred = [-1] * n
+        self.root = [-1] * n
+        self.dead = bytearray(n)
+        self.visit = [0] * n
+        self.stamp = 0
+        self.reached: list[int] = []
+        self.queue: list[int] = []
+
+    def find(self, v: int) -> int:
+        base = self.base
+        root = v
+        while base[root] != root:
+            root = base[root]
+        while base[v] != root:
+            base[v], v = root, base[v]
+        return root
+
+    def lca(self, v: int, w: int) -> int:
+        # walks up from the two blossoms by turns, until one of them reaches a base the other already visited
+        mate, pred, visit = self.mate, self.pred, self.visit
+        self.stamp += 1
+        v = self.find(v)
+        w = self.find(w)
+        while True:
+            if v != -1:
+                if visit[v] == self.stamp:
+                    return v
+                visit[v] = self.stamp
+                v = self.find(pred[mate[v]]) if mate[v] != -1 else -1
+            v, w = w, v
+
+    def shrink(self, v: int, w: int, b: int) -> list[int]:
+        # contracts the path from v up to the base b into the blossom of b, the odd vertices on the path become even.
+        # pred of the even vertices is pointed over the edge to w, so a path through the blossom can go around it.
+        # returns the vertices of the path
+        mate, pred, label, base = self.mate, self.pred, self.label, self.base
+        path = []
+        while self.find(v) != b:
+            pred[v] = w
+            w = mate[v]
+            path += [v, w]
+            if label[w] == ODD:
+                label[w] = EVEN
+                self.queue.append(w)
+            if self.find(v) == v:
+                base[v] = b
+            if self.find(w) == w:
+                base[w] = b
+            v = pred[w]
+        return path
 
-        return None, self.text + "Matching: {}".format(len(self.matching))
+    def search(self, on_blossom: BlossomCallback | None = None) -> list[list[int]]:
+        # one phase, the trees grow from all the free vertices at once. an edge between even vertices of two trees
+        # is an augmenting path, it is applied and the two trees are left for the rest of the phase. returns the
+        # applied paths, there are none only when the matching is maximum
+        indptr, indices, mate, pred, label, base = self.indptr, self.indices, self.mate, self.pred, self.label, self.base
+        root, dead = self.root, self.dead
+
+        for v in self.reached:
+            base[v] = v
+            label[v] = UNREACHED
+            pred[v] = -1
+            root[v] = -1
+            dead[v] = 0
+
+        self.reached = [v for v in range(len(mate)) if mate[v] == -1]
+        self.queue = queue = list(self.reached)
+        for v in queue:
+            label[v] = EVEN
+            root[v] = v
+
+        paths = []
+        head = 0
+        while head < len(queue):
+            v = queue[head]
+            head += 1
+            if dead[root[v]]:
+                continue
+
+            for w in indices[indptr[v]:indptr[v + 1]]:
+                if label[w] == ODD or (label[w] == EVEN and dead[root[w]]) or self.find(v) == self.find(w):
+                    continue
+
+                if label[w] == UNREACHED:
+                    # every free vertex is a root, so w is matched and its mate joins the tree
+                    label[w] = ODD
+                    pred[w] = v
+                    root[w] = root[v]
+                    label[mate[w]] = EVEN
+                    root[mate[w]] = root[v]
+                    self.reached += [w, mate[w]]
+                    queue.append(mate[w])
+                elif root[w] != root[v]:
+                    # the path goes from the root of v to v, over the edge and from w to its root
+                    dead[root[v]] = 1
+                    dead[root[w]] = 1
+                    v_path = self.flip(v, w)
+                    w_path = self.flip(w, v)
+                    paths.append(list(reversed(v_path)) + w_path)
+                    break
+                else:
+                    # both are even in the same tree, the edge closes a blossom
+                    b = self.lca(v, w)
+                    v_path = self.shrink(v, w, b)
+                    w_path = self.shrink(w, v, b)
+                    if on_blossom is not None:
+                        on_blossom([v] + v_path[1:], [w] + w_path[1:], b)
+
+        return paths
+
+    def flip(self, v: int, w: int) -> list[int]:
+        # matches the even vertex v to w and flips the path from v to its root, the pred of a vertex in a blossom
+        # goes around the blossom. returns the path from v to the root
+        mate, pred = self.mate, self.pred
+        path = [v]
+        u = mate[v]
+        mate[v] = w
+        while u != -1:
+            x = pred[u]
+            last = mate[x]
+            path += [u, x]
+            mate[u] = x
+            mate[x] = u
+            u = last
+        return path
 
 
 # algo
 class EdmondsBlossomAlgo(Algo):
-    def run(self, graph: nx.Graph, args: dict) -> list[set[int]]:
-        matching: list[set[int]] = []
-
-        if 'matching' in args:
-            matching = args['matching']
-
-        self.add_step(MatchingStep(graph, matching))
-        return self.edmonds_blossom(graph, matching)
+    def run(self, graph: nx.Graph, args: dict) -> Matching:
+        if 'draw' in args and not args['draw']:
+            self.set_record_mode(RecordMode.OFF)
 
-    def edmonds_blossom(self, graph: nx.Graph, matching: list[set[Node]]) -> list[set[Node]]:
-        path, blossom_params = self.find_augmenting_path(graph, matching)
-        if path:
-            self.add_step(MatchingStep(graph, matching, augmenting_path=path))
-            self.improve_matching_by_path(matching, path)
+        # args['workers'] solves the connected components one by one, on a process pool when it is more than 1
+        workers = args['workers'] if 'workers' in args else 0
+        if workers > 0 and 'matching' not in args and not self.is_recording(keyframe=True):
+            return self.run_components(graph, args, workers)
 
-        while path:
-            path, blossom_params = self.find_augmenting_path(graph, matching)
-            if path:
-                self.add_step(MatchingStep(graph, matching, augmenting_path=path))
-                self.improve_matching_by_path(matching, path)
+        if 'weighted' in args and args['weighted']:
+            return self.run_weighted(graph, args)
 
-        if blossom_params is not None:
-            matching = self.improve_matching_by_blossom(graph, matching, blossom_params)
+        matching = Matching(args['matching']) if 'matching' in args else Matching()
 
-        return matching
-
-    def improve_matching_by_path(self, matching: list[set[Node]], path: list[Node]) -> None:
-        for i in range(1, len(path)):
-            e = {path[i - 1], path[i]}
-            if e not in matching:
-                matching.append(e)
-            else:
-                matching.remove(e)
-
-    def improve_matching_by_blossom(self, graph: nx.Graph, matching: list[set[Node]], blossom_params: BlossomParams):
-        w, v, bfs_tree = blossom_params
-
-        p1 = self.get_path(bfs_tree, w)
-        p2 = self.get_path(bfs_tree, v)
-
-        p = []
-        while len(p1) > 0 and len(p2) and p1[0] == p2[0]:
-            p = p + [p1[0]]
-            p1.pop(0)
-            p2.pop(0)
-
-        circle = [p[-1]] + p1 + list(reversed(p2))
+        self.start_trace(graph)
+        for e in matching:
+            self.trace.edge_state(e, 'matched')
+        self.add_matching_step(len(matching), keyframe=True)
 
-        b = 0
-        while graph.has_node("b" + str(b)):
-            b += 1
+        csr = CSRGraph(graph)
+        mate = matching.to_mates(csr.index)
 
-        u = "b" + str(b)
+        # args['warm_start'] is the heuristic that extends the matching before the first phase
+        if 'warm_start' in args and args['warm_start']:
+            count = warm_start(csr, mate, args['warm_start'])
+            if self.is_recording(keyframe=True):
+                for v in range(len(mate)):
+                    if mate[v] > v:
+                        self.trace.edge_state((csr.nodes[v], csr.nodes[mate[v]]), 'matched')
+                self.add_matching_step(len(matching) + count, "Warm Start: {}, ".format(count), keyframe=True)
 
-        blossom_g = nx.Graph()
-        blossom_g.add_node(u)
-        blossom_g.add_nodes_from([v1 for v1 in graph.nodes() if v1 not in circle])
-        blossom_g.add_edges_from([(v1, w1) for v1, w1 in graph.edges() if (v1 not in circle) and (w1 not in circle)])
-        blossom_g.add_edges_from([(v1, u) for v1, w1 in graph.edges() if (v1 not in circle) and (w1 in circle)])
-        blossom_g.add_edges_from([(w1, u) for v1, w1 in graph.edges() if (v1 in circle) and (w1 not in circle)])
+        self.edmonds_blossom(csr, mate)
 
-        blossom_matching = []
-        for e in matching:
-            v1, w1 = list(e)
-            if (v1 not in circle) or (w1 not in circle):
-                if (v1 not in circle) and (w1 not in circle):
-                    blossom_matching.append(e)
-                elif v1 not in circle:
-                    blossom_matching.append({u, v1})
-                else:
-                    blossom_matching.append({u, w1})
-
-        blossom_matching = self.edmonds_blossom(blossom_g, blossom_matching)
-        self.add_step(MatchingStep(blossom_g, blossom_matching, "Blossom Graph of " + u + " - "))
+        matching = Matching.from_mates(csr.nodes, mate)
+        self.add_matching_step(len(matching), keyframe=True)
+        return matching
 
-        matching.clear()
+    def run_weighted(self, graph: nx.Graph, args: dict) -> Matching:
+        # max weight matching of the edge weights args['weight'], or of max weight among the matchings of max size
+        # when args['maxcardinality']
+        weight = args['weight'] if 'weight' in args else 'weight'
+        maxcardinality = 'maxcardinality' in args and args['maxcardinality']
+        nodes, heads, tails, weights = self.get_edge_arrays(graph, weight)
 
-        u_true = None
-        for e in blossom_matching:
-            if u not in e:
-                matching.append(e)
-            else:
-                v1 = [v1 for v1 in e if v1 != u][0]
-                u_true_arr = [w2 for w2 in circle if graph.has_edge(v1, w2)]
-                if len(u_true_arr) > 0:
-                    u_true = u_true_arr[0]
-                    matching.append({v1, u_true})
+        self.start_trace(graph)
+        self.add_weighted_step(graph, Matching(), weight, keyframe=True)
 
-        if u_true is None:
-            u_true = circle[0]
+        on_augment = None
+        if self.is_recording():
+            on_augment = partial(EdmondsBlossomAlgo.trace_augment, self, graph, nodes, weight)
 
-        end = i = circle.index(u_true)
-        i = (i + 1) % len(circle)
-        while i != end:
-            matching.append({circle[i], circle[(i + 1) % len(circle)]})
-            i = (i + 2) % len(circle)
+        mate = WeightedBlossom(len(nodes), heads, tails, weights).solve(maxcardinality, on_augment)
 
+        matching = Matching.from_mates(nodes, mate)
+        self.trace_augment(graph, nodes, weight, mate, keyframe=True)
         return matching
 
-    def in_matching(self, node: Node, matching: list[set[Node]]):
-        return not all([node not in e for e in matching])
-
-    def find_augmenting_path(self, graph: nx.Graph, matching: list[set[Node]]) -> tuple[list[Node] | None, BlossomParams | None]:
-        selected_blossom_params: BlossomParams | None = None
-
-        for s in graph.nodes():
-            if not self.in_matching(s, matching):
-                path, blossom_params = self.find_augmenting_path_from_node(graph, matching, s)
-                if path is not None:
-                    return path, None
-
-                if selected_blossom_params is None:
-                    selected_blossom_params = blossom_params
-
-        return None, selected_blossom_params
-
-    def find_augmenting_path_from_node(self, graph: nx.Graph, matching: list[set[Node]], s: Node) -> tuple[
-        list[Node] | None, BlossomParams | None]:
-        bfs_tree: dict[Node, Node | None] = {s: None}
-        explored: list[Node] = []
-        to_explore: list[Node] = [s]
-        to_explore_next: list[Node] = []
-
-        blossom_params: BlossomParams | None = None
-
-        while len(to_explore) > 0 or len(to_explore_next) > 0:
-            if len(to_explore) == 0:
-                to_explore = to_explore_next
-                to_explore_next = []
-
-            v = to_explore.pop(0)
-            explored.append(v)
-
-            from_matching_edge = (bfs_tree[v] is None) or ({v, bfs_tree[v]} in matching)
-
-            if not from_matching_edge:
-                if not self.in_matching(v, matching):
-                    return self.get_path(bfs_tree, v), None
-
-                for w in graph.neighbors(v):
-                    if {v, w} in matching:
-                        if w not in bfs_tree:
-                            to_explore_next = to_explore_next + [w]
-                            bfs_tree[w] = v
-                        elif blossom_params is None:
-                            if w in explored and (({w, bfs_tree[w]} in matching) == from_matching_edge):
-                                blossom_params = (v, w, bfs_tree.copy())
-            else:
-                for w in graph.neighbors(v):
-                    if {v, w} not in matching:
-                        if w not in bfs_tree:
-                            to_explore_next = to_explore_next + [w]
-                            bfs_tree[w] = v
-                        elif blossom_params is None:
-                            if w in explored and (({w, bfs_tree[w]} in matching) == from_matching_edge):
-                                blossom_params = (v, w, bfs_tree.copy())
-
-        return None, blossom_params
-
-    def get_path(self, bfs_tree: dict[Node, Node | None], node: Node) -> list[Node]:
-        path = []
-        while node is not None:
-            path = [node] + path
-            node = bfs_tree[node]
-        return path
+    def run_components(self, graph: nx.Graph, args: dict, workers: int) -> Matching:
+        weighted = 'weighted' in args and args['weighted']
+        nodes, heads, tails, weights = self.get_edge_arrays(graph, args['weight'] if 'weight' in args else 'weight')
+
+        if weighted:
+            maxcardinality = 'maxcardinality' in args and args['maxcardinality']
+            solver = partial(EdmondsBlossomAlgo.solve_weighted_component, maxcardinality=maxcardinality)
+        else:
+            solver = partial(EdmondsBlossomAlgo.solve_component, heuristic=args['warm_start'] if 'warm_start' in args else '')
+            weights = None
+
+        return Matching.from_mates(nodes, solve_components(len(nodes), heads, tails, weights, solver, workers))
+
+    @staticmethod
+    def solve_component(n: int, heads: array, tails: array, weights: list | None, heuristic: str = '') -> list[int]:
+        csr = CSRGraph.from_edges(n, heads, tails)
+        mate = [-1] * n
+        if heuristic:
+            warm_start(csr, mate, heuristic)
+        EdmondsBlossomAlgo(RecordMode.OFF).edmonds_blossom(csr, mate)
+        return mate
+
+    @staticmethod
+    def solve_weighted_component(n: int, heads: array, tails: array, weights: list,
+                                 maxcardinality: bool = False) -> list[int]:
+        return WeightedBlossom(n, heads, tails, weights).solve(maxcardinality)
+
+    @staticmethod
+    def get_edge_arrays(graph: nx.Graph, weight: str) -> tuple[list[Node], array, array, list]:
+        # the nodes, and the edges without self loops over the indexes of the nodes with their weights
+        nodes = list(graph.nodes())
+        index = {v: i for i, v in enumerate(nodes)}
+        heads = array('q')
+        tails = array('q')
+        weights = []
+        for v, w, d in graph.edges(data=weight, default=1):
+            if v != w:
+                heads.append(index[v])
+                tails.append(index[w])
+                weights.append(d)
+        return nodes, heads, tails, weights
+
+    def trace_augment(self, graph: nx.Graph, nodes: list[Node], weight: str, mate: list[int], keyframe: bool = False) -> None:
+        if not self.is_recording(keyframe):
+            return
+
+        matching = Matching.from_mates(nodes, mate)
+        for v, w in graph.edges():
+            self.trace.edge_state((v, w), 'matched' if matching.contains(v, w) else None)
+        self.add_weighted_step(graph, matching, weight, keyframe)
+
+    def add_weighted_step(self, graph: nx.Graph, matching: Matching, weight: str, keyframe: bool = False) -> None:
+        if not self.is_recording(keyframe):
+            return
+
+        total = sum(graph[v][w].get(weight, 1) for v, w in matching)
+        self.trace.text("Matching: {}, Weight: {}".format(len(matching), total))
+        self.add_step(self.frame_step(MatchingStep), keyframe)
+
+    def add_matching_step(self, size: int, text: str = "", keyframe: bool = False) -> None:
+        if not self.is_recording(keyframe):
+            return
+
+        self.trace.text(text + "Matching: {}".format(size))
+        self.add_step(self.frame_step(MatchingStep), keyframe)
+
+    def edmonds_blossom(self, csr: CSRGraph, mate: list[int]) -> None:
+        # every phase grows one forest and augments vertex disjoint paths, until a phase finds no path
+        search = BlossomSearch(csr, mate)
+        on_blossom = partial(EdmondsBlossomAlgo.trace_blossom, self, csr.nodes, mate) if self.is_recording() else None
+
+        size = sum(1 for v in mate if v != -1) // 2
+        while True:
+            paths = search.search(on_blossom)
+            if len(paths) == 0:
+                break
+
+            if self.is_recording():
+                nodes = csr.nodes
+                for path in paths:
+                    for i in range(1, len(path)):
+                        self.trace.edge_state((nodes[path[i - 1]], nodes[path[i]]), 'path')
+                self.add_matching_step(size, "Paths: {}, ".format(len(paths)))
+
+                for path in paths:
+                    for i in range(1, len(path)):
+                        self.trace.edge_state((nodes[path[i - 1]], nodes[path[i]]), 'matched' if i % 2 == 1 else None)
+            size += len(paths)
+
+    def trace_blossom(self, nodes: list[Node], mate: list[int], v_path: list[int], w_path: list[int], b: int) -> None:
+        # the blossom is shown by its two paths to the base and the edge between them
+        path = list(reversed(v_path)) + w_path
+        edges = [(nodes[path[i - 1]], nodes[path[i]]) for i in range(1, len(path))]
+        for e in edges:
+            self.trace.edge_state(e, 'blossom')
+
+        self.trace.text("Blossom of {}".format(nodes[b]))
+        self.add_step(self.frame_step(MatchingStep))
+
+        for i in range(1, len(path)):
+            self.trace.edge_state(edges[i - 1], 'matched' if mate[path[i - 1]] == path[i] else None)
@@ -1,147 +1,497 @@
 import typing
 
-import networkx as nx
+from array import array
+from functools import partial
 
-from src.infra.algo import Algo
-from src.infra.step import GraphStep, PlotStep, DrawReturn
+import networkx as nx
+import numpy as np
+
+from src.algo.assignment import solve_assignment, solve_assignment_batch
+from src.algo.auction import solve_auction
+from src.algo.components import solve_components
+from src.algo.warm_start import warm_start
+from src.infra.algo import Algo, RecordMode
+from src.infra.csr import CSRGraph
+from src.infra.layout import Positions
+from src.infra.matching import Matching
+from src.infra.renderer import GraphStyle
+from src.infra.step import GraphStep, StyledStep
+from src.tracker.snapshot import edge_key
+from src.tracker.trace import Trace
 
 
 Node = typing.Any
 
 
 # steps
-class BipartiteStep(PlotStep):
-    def __init__(self, graph: nx.Graph, b: set, a: set, matching: set[tuple[Node, Node]] | None = None) -> None:
-        self.graph = graph.copy()
-        self.a = a.copy()
-        self.b = b.copy()
-        self.matching = matching
+class BipartiteStep(StyledStep):
+    def __init__(self, trace: Trace, index: int) -> None:
+        self.trace = trace
+        self.index = index
 
-    def draw(self) -> DrawReturn:
+    def layout(self, graph: nx.Graph) -> Positions:
         pos = {}
-        i = 0
-        for v in self.a:
-            pos[v] = (5, i * 3)
-            i += 1
+        i = [0, 0]
+        for v, d in graph.nodes(data=True):
+            side = d["bipartite"]
+            pos[v] = (5 + 5 * side, i[side] * 3)
+            i[side] += 1
 
-        i = 0
-        for v in self.b:
-            pos[v] = (10, i * 3)
-            i += 1
+        return pos
 
-        if self.matching is not None:
-            edge_color = [("r" if (tuple(e) in self.matching) or (tuple(reversed(list(e))) in self.matching) else "b")
-                          for e in self.graph.edges()]
+    def style(self) -> GraphStyle:
+        snapshot = self.trace.get(self.index)
+        graph = snapshot.graph
+
+        edge_color = [("r" if snapshot.edge_states.get(edge_key(v, w)) == 'matched' else "b") for v, w in graph.edges()]
+        return GraphStyle(graph, self.layout(graph), edge_color=edge_color, text=snapshot.text)
+
+
+class HungarianStep(StyledStep):
+    def __init__(self, trace: Trace, index: int) -> None:
+        self.trace = trace
+        self.index = index
+
+    def style(self) -> GraphStyle:
+        snapshot = self.trace.get(self.index)
+        graph = snapshot.graph
+
+        a_matched, a_unmatched, b_matched, b_unmatched = [], [], [], []
+        for v, d in graph.nodes(data=True):
+            matched = snapshot.node_states.get(v) == 'matched'
+            if d["bipartite"] == 0:
+                (a_matched if matched else a_unmatched).append(v)
+            else:
+                (b_matched if matched else b_unmatched).append(v)
 
-            nx.draw_networkx(self.graph, pos=pos, edge_color=edge_color)
-        else:
-            nx.draw_networkx(self.graph, pos=pos)
-
-        return None, ""
-
-
-class HungarianStep(PlotStep):
-    def __init__(self, directed_graph: nx.Graph,
-                 matching: set[tuple[Node, Node]],
-                 a_matched: set, a_unmatched: set,
-                 b_matched: set, b_unmatched: set,
-                 path: list[tuple[Node, Node]] | None = None) -> None:
-        self.directed_graph = directed_graph.copy()
-        self.matching = matching.copy()
-        self.a_matched = a_matched.copy()
-        self.a_unmatched = a_unmatched.copy()
-        self.b_matched = b_matched.copy()
-        self.b_unmatched = b_unmatched.copy()
-        self.path = path
-
-    def draw(self) -> DrawReturn:
         pos = {}
         i = 0
-        for v in self.a_unmatched:
+        for v in a_unmatched:
             pos[v] = (5, i * 3)
             i += 1
 
         i = 0
-        for v in self.b_unmatched:
+        for v in b_unmatched:
             pos[v] = (10, i * 3)
             i += 1
 
-        i = max(len(self.a_unmatched), len(self.b_unmatched)) + 2
-        for v in self.a_matched:
+        i = max(len(a_unmatched), len(b_unmatched)) + 2
+        for v in a_matched:
             pos[v] = (5, i * 3)
             i += 1
 
-        i = max(len(self.a_unmatched), len(self.b_unmatched)) + 2
-        for v in self.b_matched:
+        i = max(len(a_unmatched), len(b_unmatched)) + 2
+        for v in b_matched:
             pos[v] = (10, i * 3)
             i += 1
 
-        if self.path is None:
-            self.path = []
+        # the matched edges are directed from b to a, the others from a to b
+        directed_graph = nx.DiGraph()
+        directed_graph.add_nodes_from(graph.nodes())
+        for v, w in graph.edges():
+            if graph.nodes[v]["bipartite"] == 1:
+                v, w = w, v
 
-        edge_color = ["g" if e in self.path else
-                      ("r" if (tuple(e) in self.matching) or (tuple(reversed(list(e))) in self.matching) else "b")
-                      for e in self.directed_graph.edges()]
-        nx.draw_networkx(self.directed_graph, pos=pos, edge_color=edge_color)
+            if snapshot.edge_states.get(edge_key(v, w)) == 'matched':
+                directed_graph.add_edge(w, v)
+            else:
+                directed_graph.add_edge(v, w)
+
+        edge_color = []
+        for v, w in directed_graph.edges():
+            state = snapshot.edge_states.get(edge_key(v, w))
+            edge_color.append("g" if state == 'path' else ("r" if state == 'matched' else "b"))
 
-        return None, ""
+        return GraphStyle(directed_graph, pos, edge_color=edge_color, text=snapshot.text)
 
 
 # algo
 class HungarianAlgo(Algo):
-    def run(self, graph: nx.Graph, args: dict) -> set[tuple[Node, Node]] | None:
-        matching = set()
+    def run(self, graph: nx.Graph, args: dict) -> Matching | list[Matching | None] | list[Matching] | None:
+        if 'draw' in args and not args['draw']:
+            self.set_record_mode(RecordMode.OFF)
+
+        # args['batch'] is a list of small graphs, they are solved together by solve_batch and the graph is not used
+        if 'batch' in args:
+            assignment = args['assignment'] if 'assignment' in args and args['assignment'] else None
+            matchings, _ = self.solve_batch(args['batch'], assignment, args['weight'] if 'weight' in args else 'weight')
+            return matchings
+
+        if 'edits' in args:
+            return self.run_dynamic(graph, args)
+
+        if 'assignment' in args:
+            if 'auction' in args and args['auction']:
+                return self.run_auction(graph, args)
+            return self.run_assignment(graph, args)
 
-        if len(graph.nodes()) == 0 or not nx.is_bipartite(graph):
-            self.tracker.add_step(GraphStep(graph, "Is not Bipartite Graph!"))
+        matching = Matching()
+
+        sides = self.get_sides(graph) if len(graph.nodes()) > 0 else None
+        if sides is None:
+            self.add_step(partial(GraphStep, graph, "Is not Bipartite Graph!"), keyframe=True)
             return
 
-        a, b = set(), set()
+        a, b = sides
+        hopcroft_karp = 'hopcroft_karp' in args and args['hopcroft_karp']
 
-        for v in graph.nodes():
-            to_a = True
-            for w in graph.neighbors(v):
-                if w in a:
-                    to_a = False
-                    break
-            if to_a:
-                a.add(v)
-            else:
-                b.add(v)
+        # args['workers'] solves the connected components by hopcroft karp one by one, on a process pool when it is
+        # more than 1. the components are not drawn, and every one of them starts from args['warm_start']
+        workers = args['workers'] if 'workers' in args else 0
+        if workers > 0:
+            if not hopcroft_karp or self.is_recording(keyframe=True):
+                raise ValueError("workers solve the components by hopcroft karp without drawing")
+            return self.run_components(graph, a, workers, args['warm_start'] if 'warm_start' in args else '')
 
-        edges = list(graph.edges())
+        # the sides graph is used for drawing, hopcroft karp runs on the input graph when nothing is drawn
+        if not hopcroft_karp or self.is_recording(keyframe=True):
+            edges = list(graph.edges())
 
-        graph = nx.Graph()
-        graph.add_nodes_from(a, bipartite=0)
-        graph.add_nodes_from(b, bipartite=1)
-        graph.add_edges_from(edges)
+            graph = nx.Graph()
+            graph.add_nodes_from(a, bipartite=0)
+            graph.add_nodes_from(b, bipartite=1)
+            graph.add_edges_from(edges)
 
-        self.add_step(BipartiteStep(graph, a, b))
+        self.start_trace(graph)
+        self.add_step(self.frame_step(BipartiteStep), keyframe=True)
 
-        path = self.find_augmenting_path(graph, matching)
+        # args['warm_start'] is the heuristic of the initial matching, the augmenting paths start from it
+        if 'warm_start' in args and args['warm_start']:
+            matching = self.warm_start_matching(graph, a, args['warm_start'])
 
-        while path is not None:
-            matching = self.improve_matching(a, matching, path)
+        if hopcroft_karp:
+            matching = self.hopcroft_karp(graph, a, b, matching)
+        else:
             path = self.find_augmenting_path(graph, matching)
 
-        self.add_step(BipartiteStep(graph, a, b, matching))
+            while path is not None:
+                matching = self.improve_matching(a, matching, path)
+                path = self.find_augmenting_path(graph, matching)
+
+        self.add_step(self.frame_step(BipartiteStep), keyframe=True)
+
+        return matching
+
+    def run_assignment(self, graph: nx.Graph, args: dict) -> Matching | None:
+        # weighted mode, args['assignment'] is 'min' for min cost or 'max' for max weight,
+        # the costs are args['cost'] matrix or the weights of the edges
+        maximize = args['assignment'] == 'max'
+
+        if 'cost' in args:
+            # the rows and the columns are the nodes ("R", i) and ("C", j)
+            cost = np.asarray(args['cost'], dtype=np.float64)
+            a_nodes = [("R", i) for i in range(cost.shape[0])]
+            b_nodes = [("C", j) for j in range(cost.shape[1])]
+            is_edge = np.ones(cost.shape, dtype=bool)
+
+            # the matrix is drawn as a complete bipartite graph
+            if self.is_recording(keyframe=True):
+                graph = nx.Graph()
+                graph.add_nodes_from(a_nodes, bipartite=0)
+                graph.add_nodes_from(b_nodes, bipartite=1)
+                graph.add_edges_from([(v, w) for v in a_nodes for w in b_nodes])
+            a_labels, b_labels = a_nodes, b_nodes
+        else:
+            sides = self.get_sides(graph) if len(graph.nodes()) > 0 else None
+            if sides is None:
+                self.add_step(partial(GraphStep, graph, "Is not Bipartite Graph!"), keyframe=True)
+                return
+
+            a, b = sides
+            a_nodes = [v for v in graph.nodes() if v in a]
+            b_nodes = [v for v in graph.nodes() if v in b]
+            cost, is_edge = self.get_cost_matrix(graph, a_nodes, b_nodes, args['weight'] if 'weight' in args else 'weight')
+
+            if self.is_recording(keyframe=True):
+                edges = list(graph.edges())
+                graph = nx.Graph()
+                graph.add_nodes_from(a_nodes, bipartite=0)
+                graph.add_nodes_from(b_nodes, bipartite=1)
+                graph.add_edges_from(edges)
+            a_labels, b_labels = a_nodes, b_nodes
+
+        # the pairs that are not edges are only filling, they are never better than the edges
+        if maximize:
+            matrix = np.where(is_edge & (cost > 0), cost, 0)
+        else:
+            big = np.abs(cost[is_edge]).sum() + 1 if is_edge.any() else 1
+            matrix = np.where(is_edge, cost, big)
+
+        trace = self.start_trace(graph)
+        self.add_step(self.frame_step(BipartiteStep), keyframe=True)
+
+        on_row = None
+        if 'potential_steps' in args and args['potential_steps'] and self.is_recording():
+            on_row = partial(HungarianAlgo.trace_potentials, self, a_labels, b_labels, is_edge, set())
+
+        rows, cols, _ = solve_assignment(matrix, maximize, on_row)
+
+        keep = is_edge[rows, cols]
+        if maximize:
+            keep &= cost[rows, cols] > 0
+        rows, cols = rows[keep], cols[keep]
+        total = float(cost[rows, cols].sum())
+
+        matching = Matching((a_nodes[i], b_nodes[j]) for i, j in zip(rows.tolist(), cols.tolist()))
+
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            trace.edge_state((a_labels[i], b_labels[j]), 'matched')
+        trace.text("Matching: {}, {}: {}".format(len(matching), "Weight" if maximize else "Cost", total))
+        self.add_step(self.frame_step(BipartiteStep), keyframe=True)
+
+        return matching
+
+    def run_auction(self, graph: nx.Graph, args: dict) -> Matching | None:
+        # weighted mode for large sparse graphs, solved by the epsilon scaling auction on the edges,
+        # args['epsilon'] is the final epsilon and args['workers'] splits the bidders between processes
+        maximize = args['assignment'] == 'max'
+        epsilon = args['epsilon'] if 'epsilon' in args else None
+        workers = args['workers'] if 'workers' in args else 0
+        result = self.auction(graph, maximize, args['weight'] if 'weight' in args else 'weight', epsilon, workers)
+        if result is None:
+            self.add_step(partial(GraphStep, graph, "Is not Bipartite Graph!"), keyframe=True)
+            return
+
+        matching, objective, gap = result
+
+        if self.is_recording(keyframe=True):
+            a, b = self.get_sides(graph)
+            edges = list(graph.edges())
+            graph = nx.Graph()
+            graph.add_nodes_from(a, bipartite=0)
+            graph.add_nodes_from(b, bipartite=1)
+            graph.add_edges_from(edges)
+
+        trace = self.start_trace(graph)
+        self.add_step(self.frame_step(BipartiteStep), keyframe=True)
+
+        for v, w in matching:
+            trace.edge_state((v, w), 'matched')
+        trace.text("Matching: {}, {}: {}, Gap: {:.4g}".format(len(matching), "Weight" if maximize else "Cost",
+                                                              objective, gap))
+        self.add_step(self.frame_step(BipartiteStep), keyframe=True)
 
         return matching
 
-    def get_sets(self, graph: nx.Graph, matching: set[tuple[Node, Node]]) -> tuple[set, set, set, set]:
-        matched = [v for e in matching for v in e]
+    def run_dynamic(self, graph: nx.Graph, args: dict) -> list[Matching] | None:
+        # args['edits'] is a list of ('add', v, w) and ('remove', v, w), applied one by one to a DynamicMatching of the
+        # graph. returns the matching after every edit
+        sides = self.get_sides(graph) if len(graph.nodes()) > 0 else None
+        if sides is None:
+            self.add_step(partial(GraphStep, graph, "Is not Bipartite Graph!"), keyframe=True)
+            return
+
+        dynamic = DynamicMatching(graph)
+        matchings = []
+        for op, v, w in args['edits']:
+            if op == 'add':
+                dynamic.add_edge(v, w)
+            else:
+                dynamic.remove_edge(v, w)
+            matchings.append(dynamic.matching())
+
+        self.add_step(partial(GraphStep, dynamic.graph.copy(), "Edits: {}, Matching: {}".format(len(matchings), len(dynamic))),
+                      keyframe=True)
+        return matchings
+
+    @staticmethod
+    def auction(graph: nx.Graph, maximize: bool, weight: str = 'weight', epsilon: float | None = None,
+                workers: int = 0) -> tuple[Matching, float, float] | None:
+        # the max weight or the min cost max matching by solve_auction, without trackers.
+        # returns the matching, its weight or cost and the gap from the optimum bound, or None if not bipartite
+        sides = HungarianAlgo.get_sides(graph) if len(graph.nodes()) > 0 else None
+        if sides is None:
+            return None
+
+        a, b = sides
+        a_nodes = [v for v in graph.nodes() if v in a]
+        b_nodes = [v for v in graph.nodes() if v in b]
+        indptr, indices, weights = HungarianAlgo.get_cost_arrays(graph, a_nodes, b_nodes, weight)
+
+        if maximize:
+            # the edges without positive weight are never in a max weight matching
+            positive = weights > 0
+            edge_rows = np.repeat(np.arange(len(a_nodes)), np.diff(indptr))
+            lengths = np.bincount(edge_rows[positive], minlength=len(a_nodes))
+            indptr = np.concatenate(([0], np.cumsum(lengths)))
+            indices, weights = indices[positive], weights[positive]
+
+        row_col, objective, gap = solve_auction(indptr, indices, weights, len(b_nodes), maximize, epsilon, workers=workers)
+
+        rows = np.flatnonzero(row_col >= 0)
+        matching = Matching((a_nodes[i], b_nodes[j]) for i, j in zip(rows.tolist(), row_col[rows].tolist()))
+
+        return matching, objective, gap
+
+    @staticmethod
+    def get_cost_arrays(graph: nx.Graph, a_nodes: list[Node], b_nodes: list[Node],
+                        weight: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # the edges of the a nodes as CSR arrays, the weight of an edge without the attribute is 1
+        b_index = {v: j for j, v in enumerate(b_nodes)}
+
+        indptr = array('q', [0])
+        indices = array('q')
+        weights = array('d')
+        adj = graph.adj
+        for v in a_nodes:
+            for w, d in adj[v].items():
+                indices.append(b_index[w])
+                weights.append(d.get(weight, 1))
+            indptr.append(len(indices))
+
+        return np.frombuffer(indptr, dtype=np.int64), np.frombuffer(indices, dtype=np.int64), np.frombuffer(weights)
+
+    @staticmethod
+    def get_cost_matrix(graph: nx.Graph, a_nodes: list[Node], b_nodes: list[Node], weight: str) -> tuple[np.ndarray, np.ndarray]:
+        # the weight of an edge without the attribute is 1, like in networkx
+        b_index = {v: j for j, v in enumerate(b_nodes)}
+
+        rows, cols, values = [], [], []
+        adj = graph.adj
+        for i, v in enumerate(a_nodes):
+            for w, d in adj[v].items():
+                rows.append(i)
+                cols.append(b_index[w])
+                values.append(d.get(weight, 1))
+
+        cost = np.zeros((len(a_nodes), len(b_nodes)))
+        is_edge = np.zeros((len(a_nodes), len(b_nodes)), dtype=bool)
+        cost[rows, cols] = values
+        is_edge[rows, cols] = True
+
+        return cost, is_edge
+
+    def trace_potentials(self, a_labels: list[Node], b_labels: list[Node], is_edge: np.ndarray, shown: set[tuple[int, int]],
+                         count: int, rows: np.ndarray, cols: np.ndarray, u: np.ndarray, v: np.ndarray) -> None:
+        # the assignment after every augmentation, with the dual of the potentials
+        current = {(i, j) for i, j in zip(rows.tolist(), cols.tolist()) if is_edge[i, j]}
+        for i, j in shown - current:
+            self.trace.edge_state((a_labels[i], b_labels[j]), None)
+        for i, j in current - shown:
+            self.trace.edge_state((a_labels[i], b_labels[j]), 'matched')
+        shown.clear()
+        shown.update(current)
+
+        self.trace.text("Step: {}, Assigned: {}, Dual: {:.4g}".format(count, len(current), u.sum() + v.sum()))
+        self.add_step(self.frame_step(BipartiteStep))
+
+    @staticmethod
+    def solve_batch(graphs: list[nx.Graph], assignment: str | None = None,
+                    weight: str = 'weight') -> tuple[list[Matching | None], np.ndarray]:
+        # many small bipartite graphs at once, without trackers. all the graphs are padded to the same cost matrix
+        # shape and solved by solve_assignment_batch. assignment is None for max cardinality, 'min' or 'max' like
+        # in args['assignment']. returns the matchings, None for a graph that is not bipartite, and the totals
+        instances = []
+        edge_batch, edge_rows, edge_cols, edge_weights = [], [], [], []
+        for k, graph in enumerate(graphs):
+            sides = HungarianAlgo.get_sides(graph) if len(graph.nodes()) > 0 else None
+            if sides is None:
+                instances.append(None)
+                continue
+
+            a, b = sides
+            a_nodes = [v for v in graph.nodes() if v in a]
+            b_nodes = [v for v in graph.nodes() if v in b]
+            instances.append((a_nodes, b_nodes))
+
+            # only the edges are read per graph, the matrices of all the graphs are filled from them at once
+            indptr, indices, weights = HungarianAlgo.get_cost_arrays(graph, a_nodes, b_nodes, weight)
+            edge_batch.append(np.full(len(indices), k))
+            edge_rows.append(np.repeat(np.arange(len(a_nodes)), np.diff(indptr)))
+            edge_cols.append(indices)
+            edge_weights.append(weights)
+
+        batch = len(instances)
+        a_sizes = np.array([len(instance[0]) if instance is not None else 0 for instance in instances], dtype=np.int64)
+        b_sizes = np.array([len(instance[1]) if instance is not None else 0 for instance in instances], dtype=np.int64)
+        n = max(int(a_sizes.max(initial=0)), 1)
+        m = max(int(b_sizes.max(initial=0)), 1)
+
+        cost = np.zeros((batch, n, m))
+        is_edge = np.zeros((batch, n, m), dtype=bool)
+        if len(edge_batch) > 0:
+            edges = (np.concatenate(edge_batch), np.concatenate(edge_rows), np.concatenate(edge_cols))
+            cost[edges] = np.concatenate(edge_weights)
+            is_edge[edges] = True
+
+        # a pair that is not an edge is never better than an edge, for min cost the real nodes are not paired with the
+        # padding either, so the most edges are used like in run_assignment
+        maximize = assignment != 'min'
+        if assignment is None:
+            matrices = is_edge.astype(np.float64)
+        elif assignment == 'max':
+            matrices = np.where(is_edge & (cost > 0), cost, 0)
+        else:
+            big = np.abs(np.where(is_edge, cost, 0)).sum(axis=(1, 2)) + 1
+            matrices = np.where(is_edge, cost, big[:, None, None])
+            padding = (np.arange(n)[None, :, None] >= a_sizes[:, None, None]) & (np.arange(m)[None, None, :] >= b_sizes[:, None, None])
+            matrices[padding] = 0
+
+        all_rows, all_cols, _ = solve_assignment_batch(matrices, maximize)
+
+        # the padding is never an edge, so only the pairs of real edges are kept
+        k_index = np.arange(batch)[:, None]
+        keep = is_edge[k_index, all_rows, all_cols]
+        if assignment == 'max':
+            keep &= cost[k_index, all_rows, all_cols] > 0
 
+        if assignment is None:
+            totals = keep.sum(axis=1).astype(np.float64)
+        else:
+            totals = np.where(keep, cost[k_index, all_rows, all_cols], 0).sum(axis=1)
+
+        matchings = []
+        for k, instance in enumerate(instances):
+            if instance is None:
+                matchings.append(None)
+                totals[k] = np.nan
+                continue
+
+            a_nodes, b_nodes = instance
+            rows, cols = all_rows[k][keep[k]], all_cols[k][keep[k]]
+            matchings.append(Matching((a_nodes[i], b_nodes[j]) for i, j in zip(rows.tolist(), cols.tolist())))
+
+        return matchings, totals
+
+    @staticmethod
+    def get_sides(graph: nx.Graph) -> tuple[set, set] | None:
+        # 2-coloring by BFS, the first node of every component is in a, None when the graph is not bipartite
+        adj = graph.adj
+        colors = {}
+
+        for s in graph.nodes():
+            if s in colors:
+                continue
+
+            colors[s] = 0
+            queue = [s]
+            # the queue grows while it is iterated
+            for v in queue:
+                color = colors[v]
+                for w in adj[v]:
+                    w_color = colors.get(w)
+                    if w_color is None:
+                        colors[w] = 1 - color
+                        queue.append(w)
+                    elif w_color == color:
+                        return None
+
+        a = {v for v in colors if colors[v] == 0}
+        b = {v for v in colors if colors[v] == 1}
+        return a, b
+
+    def get_sets(self, graph: nx.Graph, matching: Matching) -> tuple[set, set, set, set]:
         a = {v for v, d in graph.nodes(data=True) if d["bipartite"] == 0}
         b = {v for v, d in graph.nodes(data=True) if d["bipartite"] == 1}
 
-        a_matched = {v for v in a if v in matched}
-        a_unmatched = {v for v in a if v not in matched}
-        b_matched = {v for v in b if v in matched}
-        b_unmatched = {v for v in b if v not in matched}
+        a_matched = {v for v in a if matching.is_matched(v)}
+        a_unmatched = {v for v in a if not matching.is_matched(v)}
+        b_matched = {v for v in b if matching.is_matched(v)}
+        b_unmatched = {v for v in b if not matching.is_matched(v)}
 
         return a_matched, a_unmatched, b_matched, b_unmatched
 
-    def find_augmenting_path(self, graph: nx.Graph, matching: set[tuple]) -> list[tuple] | None:
+    def find_augmenting_path(self, graph: nx.Graph, matching: Matching) -> list[tuple] | None:
         a_matched, a_unmatched, b_matched, b_unmatched = self.get_sets(graph, matching)
 
         directed_graph = nx.DiGraph()
@@ -150,18 +500,24 @@ class HungarianAlgo(Algo):
         directed_graph.add_nodes_from(b_matched, bipartite=1)
         directed_graph.add_nodes_from(b_unmatched, bipartite=1)
 
-        for e in graph.edges:
-            if e in matching:
-                directed_graph.add_edge(e[1], e[0], color='r')
+        # the matched edges go from b to a and the others from a to b
+        for v, w in graph.edges:
+            if v in b_matched or v in b_unmatched:
+                v, w = w, v
+            if matching.contains(v, w):
+                directed_graph.add_edge(w, v, color='r')
             else:
-                directed_graph.add_edge(e[0], e[1], color='b')
+                directed_graph.add_edge(v, w, color='b')
 
-        self.add_step(HungarianStep(directed_graph, matching, a_matched, a_unmatched, b_matched, b_unmatched))
+        self.trace.text("Matching: {}".format(len(matching)))
+        self.add_step(self.frame_step(HungarianStep))
 
         for v in a_unmatched:
             path = self.find_augmenting_path_from_s(directed_graph, v, b_unmatched)
             if path is not None:
-                self.add_step(HungarianStep(directed_graph, matching, a_matched, a_unmatched, b_matched, b_unmatched, path))
+                for e in path:
+                    self.trace.edge_state(e, 'path')
+                self.add_step(self.frame_step(HungarianStep))
                 return path
 
         return None
@@ -189,8 +545,9 @@ class HungarianAlgo(Algo):
 
         return None
 
-    def improve_matching(self, a: set, matching: set[tuple], path: list[tuple]) -> set[tuple]:
-        for i in range(len(path)):
+    def improve_matching(self, a: set, matching: Matching, path: list[tuple]) -> Matching:
+        # the matched edges of the path are removed before the others are added
+        for i in list(range(1, len(path), 2)) + list(range(0, len(path), 2)):
             v, w = path[i]
             if w in a:
                 u = w
@@ -198,8 +555,411 @@ class HungarianAlgo(Algo):
                 v = u
 
             if i % 2 == 0:
-                matching.add((v, w))
+                matching.add(v, w)
+                self.trace.edge_state((v, w), 'matched')
             else:
-                matching.remove((v, w))
+                matching.remove(v, w)
+                self.trace.edge_state((v, w), None)
+
+        self.trace.node_state(path[0][0], 'matched')
+        self.trace.node_state(path[-1][1], 'matched')
 
         return matching
+
+    def warm_start_matching(self, graph: nx.Graph, a: set, heuristic: str) -> Matching:
+        # the matching of the heuristic, with the edges from a to b
+        csr = CSRGraph(graph)
+        mate = [-1] * len(csr)
+        count = warm_start(csr, mate, heuristic)
+
+        matching = Matching()
+        for v in range(len(mate)):
+            if mate[v] != -1 and csr.nodes[v] in a:
+                matching.add(csr.nodes[v], csr.nodes[mate[v]])
+
+        if self.is_recording(keyframe=True):
+            for v, w in matching:
+                self.trace.edge_state((v, w), 'matched')
+                self.trace.node_state(v, 'matched')
+                self.trace.node_state(w, 'matched')
+            self.trace.text("Warm Start: {}".format(count))
+            self.add_step(self.frame_step(HungarianStep), keyframe=True)
+
+        return matching
+
+    def run_components(self, graph: nx.Graph, a: set, workers: int, heuristic: str) -> Matching:
+        nodes = list(graph.nodes())
+        index = {v: i for i, v in enumerate(nodes)}
+        heads = array('q')
+        tails = array('q')
+        for v, w in graph.edges():
+            if v not in a:
+                v, w = w, v
+            heads.append(index[v])
+            tails.append(index[w])
+
+        solver = partial(HungarianAlgo.solve_component, heuristic=heuristic)
+        mate = solve_components(len(nodes), heads, tails, None, solver, workers)
+        return Matching((nodes[v], nodes[mate[v]]) for v in range(len(nodes)) if mate[v] != -1 and nodes[v] in a)
+
+    @staticmethod
+    def solve_component(n: int, heads: array, tails: array, weights: list | None, heuristic: str = '') -> list[int]:
+        # hopcroft karp of a component whose edges go from a to b, over the indexes of every side
+        is_a = bytearray(n)
+        for v in heads:
+            is_a[v] = 1
+        side_index = array('q', [0]) * n
+        a_vertices = []
+        b_vertices = []
+        for v in range(n):
+            if is_a[v]:
+                side_index[v] = len(a_vertices)
+                a_vertices.append(v)
+            else:
+                side_index[v] = len(b_vertices)
+                b_vertices.append(v)
+
+        indptr = array('q', [0]) * (len(a_vertices) + 1)
+        for v in heads:
+            indptr[side_index[v] + 1] += 1
+        for u in range(len(a_vertices)):
+            indptr[u + 1] += indptr[u]
+        indices = array('q', [0]) * len(heads)
+        position = indptr[:-1]
+        for k in range(len(heads)):
+            u = side_index[heads[k]]
+            indices[position[u]] = side_index[tails[k]]
+            position[u] += 1
+
+        a_mate = array('q', [-1]) * len(a_vertices)
+        b_mate = array('q', [-1]) * len(b_vertices)
+        dist = array('q', [0]) * len(a_vertices)
+        if heuristic:
+            mate = [-1] * n
+            warm_start(CSRGraph.from_edges(n, heads, tails), mate, heuristic)
+            for v in a_vertices:
+                if mate[v] != -1:
+                    a_mate[side_index[v]] = side_index[mate[v]]
+                    b_mate[side_index[mate[v]]] = side_index[v]
+
+        while True:
+            found = HungarianAlgo.hopcroft_karp_layers(indptr, indices, a_mate, b_mate, dist)
+            if found < 0:
+                break
+            HungarianAlgo.hopcroft_karp_paths(indptr, indices, a_mate, b_mate, dist, found)
+
+        mate = [-1] * n
+        for u in range(len(a_vertices)):
+            if a_mate[u] >= 0:
+                v = a_vertices[u]
+                w = b_vertices[a_mate[u]]
+                mate[v] = w
+                mate[w] = v
+        return mate
+
+    # Hopcroft-Karp
+    def hopcroft_karp(self, graph: nx.Graph, a: set, b: set, matching: Matching | None = None) -> Matching:
+        # every phase augments a maximal set of vertex disjoint shortest paths, so there are O(sqrt(V)) phases
+        # of O(E) each, the residual graph is the mates arrays over an integer indexed adjacency of a to b
+        a_nodes = [v for v in graph.nodes() if v in a]
+        b_nodes = [v for v in graph.nodes() if v in b]
+        b_index = {v: i for i, v in enumerate(b_nodes)}
+
+        indptr = array('q', [0])
+        indices = array('q')
+        adj = graph.adj
+        for v in a_nodes:
+            indices.extend([b_index[w] for w in adj[v]])
+            indptr.append(len(indices))
+
+        a_mate = array('q', [-1]) * len(a_nodes)
+        b_mate = array('q', [-1]) * len(b_nodes)
+        dist = array('q', [0]) * len(a_nodes)
+
+        # the phases start from the given matching
+        size = 0
+        if matching is not None:
+            a_index = {v: i for i, v in enumerate(a_nodes)}
+            for v, w in matching:
+                if v not in a_index:
+                    v, w = w, v
+                a_mate[a_index[v]] = b_index[w]
+                b_mate[b_index[w]] = a_index[v]
+            size = len(matching)
+
+        recording = self.is_recording()
+
+        while True:
+            found = self.hopcroft_karp_layers(indptr, indices, a_mate, b_mate, dist)
+            if found < 0:
+                break
+
+            paths = self.hopcroft_karp_paths(indptr, indices, a_mate, b_mate, dist, found)
+            size += len(paths)
+
+            if recording:
+                self.trace_phase(a_nodes, b_nodes, paths, size)
+
+        return Matching((a_nodes[u], b_nodes[a_mate[u]]) for u in range(len(a_nodes)) if a_mate[u] >= 0)
+
+    @staticmethod
+    def hopcroft_karp_layers(indptr: array, indices: array, a_mate: array, b_mate: array, dist: array) -> int:
+        # BFS from all the free vertices of a, returns the length of the shortest augmenting paths or -1
+        n = len(a_mate)
+        unreached = n + 1
+        queue = []
+        for u in range(n):
+            if a_mate[u] < 0:
+                dist[u] = 0
+                queue.append(u)
+            else:
+                dist[u] = unreached
+
+        found = unreached
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            if dist[u] + 1 >= found:
+                continue
+
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                w = b_mate[v]
+                if w < 0:
+                    found = dist[u] + 1
+                elif dist[w] == unreached:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+
+        return found if found != unreached else -1
+
+    @staticmethod
+    def hopcroft_karp_paths(indptr: array, indices: array, a_mate: array, b_mate: array, dist: array,
+                            found: int) -> list[list[tuple[int, int]]]:
+        # iterative DFS along the layers, a dead end vertex is removed from the layers for the rest of the phase
+        n = len(a_mate)
+        removed = n + 1
+        next_edge = indptr[:-1]
+        paths = []
+
+        for root in range(n):
+            if a_mate[root] >= 0:
+                continue
+
+            stack = [root]
+            via = []
+            while len(stack) > 0:
+                u = stack[-1]
+                end = indptr[u + 1]
+                pushed = False
+                while next_edge[u] < end:
+                    v = indices[next_edge[u]]
+                    next_edge[u] += 1
+                    w = b_mate[v]
+                    if w < 0:
+                        if dist[u] + 1 == found:
+                            via.append(v)
+                            pushed = True
+                            break
+                    elif dist[w] == dist[u] + 1:
+                        via.append(v)
+                        stack.append(w)
+                        pushed = True
+                        break
+
+                if not pushed:
+                    dist[u] = removed
+                    stack.pop()
+                    if len(via) > 0:
+                        via.pop()
+                    continue
+
+                if len(via) == len(stack):
+                    # reached a free vertex of b, flip the path
+                    path = []
+                    for i in range(len(stack)):
+                        a_mate[stack[i]] = via[i]
+                        b_mate[via[i]] = stack[i]
+                        path.append((stack[i], via[i]))
+                        dist[stack[i]] = removed
+                    paths.append(path)
+                    break
+
+        return paths
+
+    def trace_phase(self, a_nodes: list[Node], b_nodes: list[Node], paths: list[list[tuple[int, int]]], size: int) -> None:
+        # the paths of the phase are shown together and then flipped, path holds the new matched edges,
+        # and the edge between every two of them was matched before the phase
+        for path in paths:
+            for i in range(len(path)):
+                self.trace.edge_state((a_nodes[path[i][0]], b_nodes[path[i][1]]), 'path')
+                if i > 0:
+                    self.trace.edge_state((a_nodes[path[i][0]], b_nodes[path[i - 1][1]]), 'path')
+        self.trace.text("Matching: {}, Paths: {}".format(size - len(paths), len(paths)))
+        self.add_step(self.frame_step(HungarianStep))
+
+        for path in paths:
+            for i in range(len(path)):
+                self.trace.edge_state((a_nodes[path[i][0]], b_nodes[path[i][1]]), 'matched')
+                if i > 0:
+                    self.trace.edge_state((a_nodes[path[i][0]], b_nodes[path[i - 1][1]]), None)
+            self.trace.node_state(a_nodes[path[0][0]], 'matched')
+            self.trace.node_state(b_nodes[path[-1][1]], 'matched')
+        self.trace.text("Matching: {}".format(size))
+
+
+# dynamic matching
+class DynamicMatching:
+    # maximum matching of a bipartite graph that is kept maximum while the graph is changed,
+    # every change is repaired by at most one augmenting path that is searched from the changed nodes
+    graph: nx.Graph
+    sides: dict[Node, int]
+    matched: Matching
+
+    def __init__(self, graph: nx.Graph, matching: Matching | None = None) -> None:
+        sides = HungarianAlgo.get_sides(graph)
+        if sides is None:
+            raise ValueError("the graph is not bipartite")
+
+        a, b = sides
+        self.graph = graph.copy()
+        self.sides = {v: 0 if v in a else 1 for v in graph.nodes()}
+        self.matched = Matching()
+
+        if matching is None:
+            matching = HungarianAlgo(RecordMode.OFF).hopcroft_karp(graph, a, b)
+
+        for v, w in matching:
+            if not graph.has_edge(v, w) or self.matched.is_matched(v) or self.matched.is_matched(w):
+                raise ValueError("the matching is not a matching of the graph")
+            self.matched.add(v, w)
+
+        # a seed matching is completed like in the Hungarian algo, a node without an augmenting path stays without one
+        for v in a:
+            if not self.matched.is_matched(v):
+                self.augment(self.find_path(v, False))
+
+    def __len__(self) -> int:
+        return len(self.matched)
+
+    def matching(self) -> Matching:
+        # a copy with the edges as (side 0, side 1)
+        return Matching((v, w) if self.sides[v] == 0 else (w, v) for v, w in self.matched)
+
+    def mate(self, v: Node) -> Node | None:
+        return self.matched.mate(v)
+
+    # changes
+    def add_node(self, v: Node, side: int = 0) -> None:
+        if v not in self.graph:
+            self.graph.add_node(v)
+            self.sides[v] = side
+
+    def remove_node(self, v: Node) -> None:
+        matched = self.matched.is_matched(v)
+        w = self.matched.unmatch(v)
+        self.graph.remove_node(v)
+        del self.sides[v]
+
+        if matched:
+            self.augment(self.find_path(w, False))
+
+    def add_edge(self, v: Node, w: Node) -> None:
+        if self.graph.has_edge(v, w):
+            return
+
+        if v not in self.sides and w not in self.sides:
+            self.add_node(v, 0)
+        if v not in self.sides:
+            self.add_node(v, 1 - self.sides[w])
+        if w not in self.sides:
+            self.add_node(w, 1 - self.sides[v])
+
+        if self.sides[v] == self.sides[w]:
+            if nx.has_path(self.graph, v, w):
+                raise ValueError("the edge ({}, {}) makes the graph not bipartite".format(v, w))
+            # the edge joins two components, the sides of one of them are swapped
+            for u in nx.node_connected_component(self.graph, w):
+                self.sides[u] = 1 - self.sides[u]
+
+        self.graph.add_edge(v, w)
+
+        # a new augmenting path goes through the new edge: from a free node to v and from w to a free node
+        to_v = self.find_path(v, True) if self.matched.is_matched(v) else [v]
+        if to_v is None:
+            return
+        from_w = self.find_path(w, True) if self.matched.is_matched(w) else [w]
+        if from_w is None:
+            return
+
+        self.augment(self.simple_path(list(reversed(to_v)) + from_w))
+
+    def remove_edge(self, v: Node, w: Node) -> None:
+        self.graph.remove_edge(v, w)
+        if not self.matched.contains(v, w):
+            return
+
+        # the new augmenting path starts from v or from w
+        self.matched.remove(v, w)
+        path = self.find_path(v, False)
+        if path is None:
+            path = self.find_path(w, False)
+        self.augment(path)
+
+    # augmenting paths
+    def find_path(self, s: Node, from_mate: bool) -> list[Node] | None:
+        # BFS over the alternating paths from s to a free node, that start with the matched edge of s when from_mate
+        mates = self.matched.mates
+        parents: dict[Node, Node | None] = {s: None}
+        queue = [s]
+        if from_mate:
+            parents[mates[s]] = s
+            queue = [mates[s]]
+
+        adj = self.graph.adj
+        # the queue grows while it is iterated
+        for x in queue:
+            x_mate = mates.get(x)
+            for y in adj[x]:
+                if y in parents or y == x_mate:
+                    continue
+                parents[y] = x
+
+                z = mates.get(y)
+                if z is None:
+                    path = [y]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return list(reversed(path))
+
+                if z not in parents:
+                    parents[z] = y
+                    queue.append(z)
+
+        return None
+
+    @staticmethod
+    def simple_path(walk: list[Node]) -> list[Node]:
+        # cuts the loops of an alternating walk, in a bipartite graph the path is still alternating
+        path = []
+        positions = {}
+        for v in walk:
+            if v in positions:
+                for u in path[positions[v] + 1:]:
+                    del positions[u]
+                del path[positions[v] + 1:]
+            else:
+                positions[v] = len(path)
+                path.append(v)
+
+        return path
+
+    def augment(self, path: list[Node] | None) -> None:
+        # the path starts and ends in free nodes, every second edge is matched after the flip
+        if path is None:
+            return
+
+        for i in range(1, len(path) - 1, 2):
+            self.matched.remove(path[i], path[i + 1])
+        for i in range(0, len(path) - 1, 2):
+            self.matched.add(path[i], path[i + 1])
@@ -83,6 +83,16 @@ def test_k_regular(draw: bool, n: int, k: int, to_remove: int = 0):
     return [(graph, {'draw': draw})]
 
 
+def test_random_regular(draw: bool, n: int, k: int, k_iter: int):
+    # random k-regular graphs, the small cubic ones often have a cut of 2 vertices, so y and z can split the graph
+    graphs = []
+    for i in range(k_iter):
+        graph = nx.random_regular_graph(k, n, seed=random.randint(0, 2 ** 32))
+        graphs += [(graph, {'draw': draw})]
+
+    return graphs
+
+
 def test_k_regular_min_cut_one(draw: bool, k: int, n_blocks: int, max_block_nodes: int):
     block_graph = networkx.generators.random_tree(n_blocks, create_using=nx.DiGraph)
     block_nodes = list(block_graph.nodes())
@@ -118,8 +128,8 @@ def test_k_regular_min_cut_one(draw: bool, k: int, n_blocks: int, max_block_node
 
         graph_v = components[g_v]["g"]
         while a > 0:
-            graph_nodes = list([node for (node, val) in graph_v.degree() if val == k])
-            edges = [(v, w) for (v, w) in graph.edges() if v in graph_nodes and w in graph_nodes]
+            graph_nodes = set([node for (node, val) in graph_v.degree() if val == k])
+            edges = [(v, w) for (v, w) in graph.edges(graph_nodes) if w in graph_nodes]
 
             random.shuffle(edges)
             e = edges[0]
@@ -130,8 +140,8 @@ def test_k_regular_min_cut_one(draw: bool, k: int, n_blocks: int, max_block_node
 
         graph_w = components[g_w]["g"]
         while b > 0:
-            graph_nodes = list([node for (node, val) in graph_w.degree() if val == k])
-            edges = [(v, w) for (v, w) in graph.edges() if v in graph_nodes and w in graph_nodes]
+            graph_nodes = set([node for (node, val) in graph_w.degree() if val == k])
+            edges = [(v, w) for (v, w) in graph.edges(graph_nodes) if w in graph_nodes]
 
             random.shuffle(edges)
             e = edges[0]
@@ -56,7 +56,7 @@ def test_from_random():
     return [data_to_graph(*data) for data in graphs]
 
 
-def test_random_graphs(min_n: int, max_n: int, p: float, k_iter: int):
+def test_random_graphs(min_n: int, max_n: int, p: float, k_iter: int, warm_start: str = ''):
     tests_data = []
 
     for i_iter in range(k_iter):
@@ -69,4 +69,36 @@ def test_random_graphs(min_n: int, max_n: int, p: float, k_iter: int):
 
         tests_data += [(n, edges)]
 
-    return [data_to_graph(*data) for data in tests_data]
+    graphs = [data_to_graph(*data) for data in tests_data]
+    if warm_start:
+        for graph, args in graphs:
+            args['warm_start'] = warm_start
+    return graphs
+
+
+def test_random_weighted_graphs(min_n: int, max_n: int, p: float, k_iter: int, max_weight: int, maxcardinality: bool):
+    graphs = test_random_graphs(min_n, max_n, p, k_iter)
+    for graph, args in graphs:
+        for v, w in graph.edges():
+            graph[v][w]['weight'] = random.randint(1, max_weight)
+        args['weighted'] = True
+        args['maxcardinality'] = maxcardinality
+    return graphs
+
+
+def test_large_weighted_graph(n: int, degree: int, max_weight: int):
+    graph = nx.gnm_random_graph(n, n * degree // 2, seed=random.randint(0, 2 ** 32))
+    for v, w in graph.edges():
+        graph[v][w]['weight'] = random.randint(1, max_weight)
+    return [(graph, {'weighted': True, 'draw': False})]
+
+
+def test_forest(k: int, max_n: int, p: float, workers: int, weighted: bool):
+    # k random components of up to max_n nodes
+    graph = nx.Graph()
+    for i in range(k):
+        component = nx.gnp_random_graph(random.randint(1, max_n), p, seed=random.randint(0, 2 ** 32))
+        graph.add_nodes_from(((i, v) for v in component.nodes()))
+        graph.add_edges_from((((i, v), (i, w), {'weight': random.randint(1, 100)}) for v, w in component.edges()))
+
+    return [(graph, {'workers': workers, 'weighted': weighted, 'draw': False})]
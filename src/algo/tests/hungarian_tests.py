@@ -3,9 +3,10 @@
 import random
 
 import networkx as nx
+import numpy as np
 
 
-def test_random_graph(min_n: int, max_n: int, p: float, k: int) -> list[tuple[nx.Graph, dict]]:
+def test_random_graph(min_n: int, max_n: int, p: float, k: int, hopcroft_karp: bool = False) -> list[tuple[nx.Graph, dict]]:
     graphs = []
 
     for i in range(k):
@@ -24,6 +25,82 @@ def test_random_graph(min_n: int, max_n: int, p: float, k: int) -> list[tuple[nx
                 if random.random() < p:
                     graph.add_edge(v, w)
 
-        graphs.append((graph, {}))
+        graphs.append((graph, {'hopcroft_karp': hopcroft_karp}))
 
     return graphs
+
+
+def test_large_random_graph(n: int, m: int, k: int, hopcroft_karp: bool, warm_start: str = '') -> list[tuple[nx.Graph, dict]]:
+    graph = nx.bipartite.gnmk_random_graph(n, m, k, seed=random.randint(0, 2 ** 32))
+    return [(graph, {'hopcroft_karp': hopcroft_karp, 'warm_start': warm_start, 'draw': False})]
+
+
+def test_bipartite_forest(k: int, max_n: int, p: float, workers: int) -> list[tuple[nx.Graph, dict]]:
+    # k random bipartite components of up to max_n nodes on every side
+    graph = nx.Graph()
+    for i in range(k):
+        component = nx.bipartite.random_graph(random.randint(1, max_n), random.randint(1, max_n), p,
+                                              seed=random.randint(0, 2 ** 32))
+        graph.add_nodes_from(((i, v) for v in component.nodes()))
+        graph.add_edges_from((((i, v), (i, w)) for v, w in component.edges()))
+
+    return [(graph, {'workers': workers, 'hopcroft_karp': True, 'draw': False})]
+
+
+def test_random_weighted_graph(min_n: int, max_n: int, p: float, k: int, maximize: bool) -> list[tuple[nx.Graph, dict]]:
+    graphs = []
+
+    for graph, args in test_random_graph(min_n, max_n, p, k):
+        for v, w in graph.edges():
+            graph[v][w]['weight'] = random.randint(1, 20)
+
+        graphs.append((graph, {'assignment': 'max' if maximize else 'min', 'potential_steps': True}))
+
+    return graphs
+
+
+def test_batch(k: int, max_n: int, p: float, assignment: str) -> list[tuple[nx.Graph, dict]]:
+    # k small weighted graphs, solved together as one batch
+    graphs = [graph for graph, args in test_random_weighted_graph(1, max_n, p, k, False)]
+    return [(nx.Graph(), {'batch': graphs, 'assignment': assignment})]
+
+
+def test_dynamic(n: int, p: float, edits: int) -> list[tuple[nx.Graph, dict]]:
+    # a random bipartite graph and random edits of its edges, an edge is removed or a new one is added
+    a = ["A" + str(i) for i in range(0, n)]
+    b = ["B" + str(i) for i in range(0, n)]
+    graph = nx.Graph()
+    graph.add_nodes_from(a, bipartite=0)
+    graph.add_nodes_from(b, bipartite=1)
+    graph.add_edges_from((v, w) for v in a for w in b if random.random() < p)
+
+    edges = set(graph.edges())
+    changes = []
+    for i in range(edits):
+        if len(edges) > 0 and random.random() < 0.5:
+            v, w = random.choice(sorted(edges))
+            edges.remove((v, w))
+            changes.append(('remove', v, w))
+        else:
+            v, w = random.choice(a), random.choice(b)
+            if (v, w) not in edges:
+                edges.add((v, w))
+                changes.append(('add', v, w))
+
+    return [(graph, {'edits': changes})]
+
+
+def test_random_cost_matrix(n: int, m: int, maximize: bool) -> list[tuple[nx.Graph, dict]]:
+    cost = np.random.default_rng(random.randint(0, 2 ** 32)).random((n, m))
+    return [(nx.Graph(), {'assignment': 'max' if maximize else 'min', 'cost': cost, 'draw': False})]
+
+
+def test_auction_graph(n: int, degree: int, maximize: bool, epsilon: float, workers: int) -> list[tuple[nx.Graph, dict]]:
+    graph = nx.bipartite.gnmk_random_graph(n, n, n * degree, seed=random.randint(0, 2 ** 32))
+    for v, w in graph.edges():
+        graph[v][w]['weight'] = random.randint(1, 1000)
+
+    args = {'assignment': 'max' if maximize else 'min', 'auction': True, 'workers': workers, 'draw': False}
+    if epsilon > 0:
+        args['epsilon'] = epsilon
+    return [(graph, args)]
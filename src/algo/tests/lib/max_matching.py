@@ -3,26 +3,49 @@
 import networkx as nx
 
 from src.algo.tests.lib.edmonds_blossom import edmonds_blossom
+from src.infra.matching import Matching
 
 
-def is_matching(graph: nx.Graph, matching: list[set[int]]) -> bool:
-    vs = []
-    for v, w in matching:
-        if (not graph.has_edge(v, w)) or (v in vs) or (w in vs):
+def is_matching(graph: nx.Graph, matching: Matching | list[set[int]]) -> bool:
+    if not isinstance(matching, Matching):
+        try:
+            matching = Matching(matching)
+        except ValueError:
             return False
-        vs.append(v)
-        vs.append(w)
 
-    return len(set(vs)) == 2 * len(matching)
+    return all(graph.has_edge(v, w) for v, w in matching)
 
 
 def get_max_matching(graph: nx.Graph):
-    edges = [tuple(e) for e in graph.edges()]
-    n = len(list(graph.nodes()))
+    # the lib is slow on large graphs, so every connected component is solved alone
+    return sum(get_component_max_matching(graph.subgraph(nodes)) for nodes in nx.connected_components(graph) if len(nodes) > 1)
+
+
+def get_component_max_matching(graph: nx.Graph):
+    # the lib works on the nodes 0..n-1
+    index = {v: i for i, v in enumerate(graph.nodes())}
+    edges = [(index[v], index[w]) for v, w in graph.edges()]
+    n = len(index)
 
     matching = edmonds_blossom((list(range(n)), edges))
 
     if matching == "NICE":
-        return (n - len(list(nx.isolates(graph)))) // 2
+        # the lib gives up on this graph, networkx is slower but exact
+        return len(nx.max_weight_matching(graph, maxcardinality=True))
 
     return len(matching)
+
+
+def get_matching_weight(graph: nx.Graph, matching: Matching, weight: str = 'weight'):
+    return sum(graph[v][w].get(weight, 1) for v, w in matching)
+
+
+def get_max_weight(graph: nx.Graph, maxcardinality: bool = False, weight: str = 'weight'):
+    # networkx on every connected component, returns the weight and the size
+    total, size = 0, 0
+    for nodes in nx.connected_components(graph):
+        if len(nodes) > 1:
+            matching = nx.max_weight_matching(graph.subgraph(nodes), maxcardinality=maxcardinality, weight=weight)
+            total += sum(graph[v][w].get(weight, 1) for v, w in matching)
+            size += len(matching)
+    return total, size
@@ -0,0 +1,137 @@
+
+from array import array
+
+from src.infra.csr import CSRGraph
+
+
+# linear time heuristics that match free vertices before the augmenting searches start, over a mate array of the
+# integer indexed graph where -1 is a free vertex. the vertices that are already matched are kept
+HEURISTICS = ('greedy', 'min_degree', 'karp_sipser')
+
+
+def warm_start(csr: CSRGraph, mate: list[int], heuristic: str) -> int:
+    # returns the number of the new matched edges
+    if heuristic == 'greedy':
+        return greedy_matching(csr, mate)
+    if heuristic == 'min_degree':
+        return min_degree_matching(csr, mate)
+    if heuristic == 'karp_sipser':
+        return karp_sipser_matching(csr, mate)
+    raise ValueError("unknown warm start '{}', expected one of {}".format(heuristic, ", ".join(HEURISTICS)))
+
+
+def greedy_matching(csr: CSRGraph, mate: list[int]) -> int:
+    # every free vertex is matched to its first free neighbor
+    indptr, indices = csr.indptr, csr.indices
+    count = 0
+    for v in range(len(mate)):
+        if mate[v] != -1:
+            continue
+        for w in indices[indptr[v]:indptr[v + 1]]:
+            if mate[w] == -1 and w != v:
+                mate[v] = w
+                mate[w] = v
+                count += 1
+                break
+    return count
+
+
+def free_degrees(csr: CSRGraph, mate: list[int]) -> array:
+    # the number of the free neighbors of every free vertex
+    indptr, indices = csr.indptr, csr.indices
+    degree = array('q', [0]) * len(mate)
+    for v in range(len(mate)):
+        if mate[v] == -1:
+            degree[v] = sum(1 for w in indices[indptr[v]:indptr[v + 1]] if mate[w] == -1 and w != v)
+    return degree
+
+
+def remove_matched(csr: CSRGraph, mate: list[int], degree: array, v: int, changed: list[int]) -> None:
+    # v was just matched, its free neighbors lose one degree and are added to changed
+    indptr, indices = csr.indptr, csr.indices
+    for w in indices[indptr[v]:indptr[v + 1]]:
+        if mate[w] == -1 and w != v:
+            degree[w] -= 1
+            changed.append(w)
+
+
+def min_degree_matching(csr: CSRGraph, mate: list[int]) -> int:
+    # the free vertex with the fewest free neighbors is matched to its neighbor with the fewest free neighbors.
+    # the buckets of the degrees keep stale entries, they are skipped when the degree does not match
+    indptr, indices = csr.indptr, csr.indices
+    degree = free_degrees(csr, mate)
+
+    buckets: list[list[int]] = [[] for _ in range(max(degree, default=0) + 1)]
+    for v in range(len(mate)):
+        if mate[v] == -1 and degree[v] > 0:
+            buckets[degree[v]].append(v)
+
+    count = 0
+    low = 1
+    changed: list[int] = []
+    while low < len(buckets):
+        if len(buckets[low]) == 0:
+            low += 1
+            continue
+
+        v = buckets[low].pop()
+        if mate[v] != -1 or degree[v] != low:
+            continue
+
+        best = -1
+        for w in indices[indptr[v]:indptr[v + 1]]:
+            if mate[w] == -1 and w != v and (best == -1 or degree[w] < degree[best]):
+                best = w
+
+        mate[v] = best
+        mate[best] = v
+        count += 1
+
+        remove_matched(csr, mate, degree, v, changed)
+        remove_matched(csr, mate, degree, best, changed)
+        for w in changed:
+            if mate[w] == -1 and degree[w] > 0:
+                buckets[degree[w]].append(w)
+                low = min(low, degree[w])
+        changed.clear()
+
+    return count
+
+
+def karp_sipser_matching(csr: CSRGraph, mate: list[int]) -> int:
+    # a free vertex with one free neighbor is always matched to it, that is safe for a maximum matching.
+    # when there is none, the next free vertex is matched to its first free neighbor
+    indptr, indices = csr.indptr, csr.indices
+    degree = free_degrees(csr, mate)
+    ones = [v for v in range(len(mate)) if mate[v] == -1 and degree[v] == 1]
+
+    count = 0
+    changed: list[int] = []
+    next_vertex = 0
+    while True:
+        if len(ones) > 0:
+            v = ones.pop()
+            if mate[v] != -1 or degree[v] != 1:
+                continue
+        else:
+            while next_vertex < len(mate) and (mate[next_vertex] != -1 or degree[next_vertex] == 0):
+                next_vertex += 1
+            if next_vertex == len(mate):
+                break
+            v = next_vertex
+
+        for w in indices[indptr[v]:indptr[v + 1]]:
+            if mate[w] == -1 and w != v:
+                mate[v] = w
+                mate[w] = v
+                break
+        count += 1
+
+        remove_matched(csr, mate, degree, v, changed)
+        remove_matched(csr, mate, degree, mate[v], changed)
+        for w in changed:
+            if mate[w] == -1 and degree[w] == 1:
+                ones.append(w)
+        changed.clear()
+
+    return count
@@ -0,0 +1,527 @@
+
+import heapq
+import typing
+
+from array import array
+
+
+AugmentCallback = typing.Callable[[list[int]], None]
+
+# the labels of the top level blossoms, a vertex inside a T blossom is also labeled T once an S vertex reaches it.
+# BREADCRUMB marks the blossoms that scan_blossom walked over
+FREE = 0
+S = 1
+T = 2
+BREADCRUMB = 5
+
+# the change of the dual of a vertex and of a top level blossom per unit of delta, by the label of the top level blossom
+VERTEX_RATE = (0, -1, 1)
+BLOSSOM_RATE = (0, 1, -1)
+
+
+class WeightedBlossom:
+    # maximum weight matching of a general graph by the primal dual blossom algorithm over integer indexed arrays.
+    # the edge k is (heads[k], tails[k]) with the endpoints 2k and 2k + 1, the vertices 0..n-1 are the trivial
+    # blossoms and n..2n-1 are the ids of the nontrivial ones.
+    # every free vertex is the root of an alternating tree, and the trees are kept between augmentations, only the
+    # two trees of an augmenting path are dissolved. the duals of the vertices and the top level blossoms are stored
+    # as of the total delta when their top level blossom got its label, and the next delta comes from lazy heaps
+    # keyed by the total delta at which an edge becomes tight or a T blossom reaches zero
+    def __init__(self, n: int, heads: array, tails: array, weights: list) -> None:
+        self.n = n
+        self.heads = heads
+        self.tails = tails
+        self.weights = weights
+        self.integral = all(type(w) is int for w in weights)
+        self.max_weight = max(0, max(weights, default=0))
+
+        self.endpoint = array('q', [0]) * (2 * len(heads))
+        self.endpoint[0::2] = heads
+        self.endpoint[1::2] = tails
+
+        # the remote endpoints of the edges of every vertex
+        degree = [0] * (n + 1)
+        for k in range(len(heads)):
+            degree[heads[k] + 1] += 1
+            degree[tails[k] + 1] += 1
+        self.indptr = array('q', [0]) * (n + 1)
+        for v in range(n):
+            self.indptr[v + 1] = self.indptr[v] + degree[v + 1]
+        self.ends = array('q', [0]) * (2 * len(heads))
+        position = self.indptr[:-1]
+        for k in range(len(heads)):
+            self.ends[position[heads[k]]] = 2 * k + 1
+            position[heads[k]] += 1
+            self.ends[position[tails[k]]] = 2 * k
+            position[tails[k]] += 1
+
+        # mate[v] is the remote endpoint of the matched edge of v
+        self.mate = [-1] * n
+        self.label = [FREE] * (2 * n)
+        self.labelend = [-1] * (2 * n)
+        self.inblossom = list(range(n))
+        self.blossomparent = [-1] * (2 * n)
+        self.blossomchilds: list[list[int] | None] = [None] * (2 * n)
+        self.blossombase = list(range(n)) + [-1] * n
+        self.blossomendps: list[list[int] | None] = [None] * (2 * n)
+        self.unused = list(range(2 * n - 1, n - 1, -1))
+
+        self.dualvar = [self.max_weight] * n + [0] * n
+        self.since = [0] * (2 * n)
+        self.total = 0
+
+        # the root of the tree of every labeled top level blossom, and the blossoms that joined every tree
+        self.tree = [-1] * (2 * n)
+        self.members: dict[int, list[int]] = {}
+
+        self.queue: list[int] = []
+        self.free_heap: list[tuple] = []
+        self.even_heap: list[tuple] = []
+        self.odd_heap: list[tuple] = []
+        self.free_count = n
+
+    def leaves(self, b: int) -> list[int]:
+        if b < self.n:
+            return [b]
+
+        leaves = []
+        stack = [b]
+        while len(stack) > 0:
+            b = stack.pop()
+            if b < self.n:
+                leaves.append(b)
+            else:
+                stack.extend(self.blossomchilds[b])
+        return leaves
+
+    def dual(self, v: int) -> typing.Any:
+        b = self.inblossom[v]
+        return self.dualvar[v] + VERTEX_RATE[self.label[b]] * (self.total - self.since[b])
+
+    def slack(self, k: int) -> typing.Any:
+        return self.dual(self.heads[k]) + self.dual(self.tails[k]) - 2 * self.weights[k]
+
+    def settle(self, b: int) -> None:
+        # stores the duals of the top level blossom b and its vertices as of now
+        d = self.total - self.since[b]
+        if d != 0:
+            rate = VERTEX_RATE[self.label[b]]
+            if rate != 0:
+                for v in self.leaves(b):
+                    self.dualvar[v] += rate * d
+                if b >= self.n:
+                    self.dualvar[b] += BLOSSOM_RATE[self.label[b]] * d
+        self.since[b] = self.total
+
+    def solve(self, maxcardinality: bool = False, on_augment: AugmentCallback | None = None) -> list[int]:
+        # returns the mate of every vertex, -1 for a free vertex. with maxcardinality the matching is of max weight
+        # among the matchings of max size
+        for v in range(self.n):
+            self.assign_label(v, S, -1)
+
+        label, inblossom = self.label, self.inblossom
+        indptr, ends = self.indptr, self.ends
+        while self.free_count > 1:
+            while len(self.queue) > 0:
+                v = self.queue.pop()
+                for p in ends[indptr[v]:indptr[v + 1]]:
+                    if label[inblossom[v]] != S:
+                        break
+                    if self.consider(v, p) and on_augment is not None:
+                        on_augment(self.mates())
+
+            if self.free_count < 2:
+                break
+
+            # the total delta at which the next event happens, the free vertices reach zero at max_weight
+            kind, item = 1, -1
+            key = self.max_weight if not maxcardinality else None
+            for heap_kind, heap in ((2, self.free_heap), (3, self.even_heap), (4, self.odd_heap)):
+                top = self.heap_top(heap_kind, heap)
+                if top is not None and (key is None or top[0] < key):
+                    kind, key, item = heap_kind, top[0], top[1]
+
+            if key is None or kind == 1:
+                break
+
+            self.total = key
+            if kind == 4:
+                heapq.heappop(self.odd_heap)
+                self.expand_odd(item)
+                continue
+
+            heapq.heappop(self.free_heap if kind == 2 else self.even_heap)
+            if label[inblossom[self.heads[item]]] == S:
+                v, p = self.heads[item], 2 * item + 1
+            else:
+                v, p = self.tails[item], 2 * item
+            if self.consider(v, p, tight=True) and on_augment is not None:
+                on_augment(self.mates())
+
+        return self.mates()
+
+    def mates(self) -> list[int]:
+        return [self.endpoint[p] if p != -1 else -1 for p in self.mate]
+
+    def heap_top(self, kind: int, heap: list[tuple]) -> tuple | None:
+        # the entries of the heaps are not removed when they change, the top is dropped when it is no longer of its
+        # kind and is pushed again when its key changed
+        while len(heap) > 0:
+            key, item = heap[0]
+            current = self.edge_key(kind, item) if kind != 4 else self.blossom_key(item)
+            if current is None:
+                heapq.heappop(heap)
+            elif current != key:
+                heapq.heapreplace(heap, (current, item))
+            else:
+                return key, item
+        return None
+
+    def edge_key(self, kind: int, k: int) -> typing.Any:
+        bu = self.inblossom[self.heads[k]]
+        bw = self.inblossom[self.tails[k]]
+        lu, lw = self.label[bu], self.label[bw]
+        if kind == 2:
+            if (lu == S and lw == FREE) or (lu == FREE and lw == S):
+                return self.slack(k) + self.total
+        elif lu == S and lw == S and bu != bw:
+            return (self.slack(k) // 2 if self.integral else self.slack(k) / 2) + self.total
+        return None
+
+    def blossom_key(self, b: int) -> typing.Any:
+        if self.blossombase[b] < 0 or self.blossomparent[b] != -1 or self.label[b] != T:
+            return None
+        return self.dualvar[b] - (self.total - self.since[b]) + self.total
+
+    def consider(self, v: int, p: int, tight: bool = False) -> bool:
+        # the edge from the S vertex v to the endpoint p, returns True when it augmented the matching
+        k = p >> 1
+        w = self.endpoint[p]
+        bv = self.inblossom[v]
+        bw = self.inblossom[w]
+        label = self.label
+        if bv == bw:
+            return False
+
+        if not tight:
+            kslack = self.slack(k)
+            if kslack > 0:
+                if label[bw] == S:
+                    key = (kslack // 2 if self.integral else kslack / 2) + self.total
+                    heapq.heappush(self.even_heap, (key, k))
+                elif label[bw] == FREE:
+                    heapq.heappush(self.free_heap, (kslack + self.total, k))
+                return False
+
+        if label[bw] == FREE:
+            self.assign_label(w, T, p ^ 1)
+        elif label[bw] == S:
+            if self.tree[bv] != self.tree[bw]:
+                self.augment(k)
+                return True
+            self.add_blossom(self.scan_blossom(v, w), k)
+        elif label[w] == FREE:
+            # w is inside a T blossom and was not reached yet, it is labeled when the blossom is expanded
+            label[w] = T
+            self.labelend[w] = p ^ 1
+        return False
+
+    def assign_label(self, w: int, t: int, p: int) -> None:
+        # labels the free top level blossom of w through the endpoint p, a T blossom labels its mate S
+        b = self.inblossom[w]
+        root = w if p == -1 else self.tree[self.inblossom[self.endpoint[p]]]
+        self.label[w] = self.label[b] = t
+        self.labelend[w] = self.labelend[b] = p
+        self.since[b] = self.total
+        self.join(b, root)
+
+        if t == S:
+            self.queue.extend(self.leaves(b))
+        else:
+            if b >= self.n:
+                heapq.heappush(self.odd_heap, (self.dualvar[b] + self.total, b))
+            base = self.blossombase[b]
+            self.assign_label(self.endpoint[self.mate[base]], S, self.mate[base] ^ 1)
+
+    def join(self, b: int, root: int) -> None:
+        self.tree[b] = root
+        if root not in self.members:
+            self.members[root] = []
+        self.members[root].append(b)
+
+    def scan_blossom(self, v: int, w: int) -> int:
+        # walks up from v and w by turns to the first common blossom, returns its base or -1 when there is none
+        label, labelend, inblossom, endpoint = self.label, self.labelend, self.inblossom, self.endpoint
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] == BREADCRUMB:
+                base = self.blossombase[b]
+                break
+            path.append(b)
+            label[b] = BREADCRUMB
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+
+        for b in path:
+            label[b] = S
+        return base
+
+    def add_blossom(self, base: int, k: int) -> None:
+        # the edge k closes a cycle of blossoms through base into a new S blossom
+        inblossom, labelend, endpoint, parent = self.inblossom, self.labelend, self.endpoint, self.blossomparent
+        v, w = self.heads[k], self.tails[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+
+        b = self.unused.pop()
+        self.blossombase[b] = base
+        parent[b] = -1
+        parent[bb] = b
+
+        path = []
+        endps = []
+        while bv != bb:
+            parent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            parent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        self.blossomchilds[b] = path
+        self.blossomendps[b] = endps
+
+        for c in path:
+            self.settle(c)
+
+        self.label[b] = S
+        labelend[b] = labelend[bb]
+        self.dualvar[b] = 0
+        self.since[b] = self.total
+        self.join(b, self.tree[bb])
+
+        # the T vertices become S, so they are scanned
+        for v in self.leaves(b):
+            if self.label[inblossom[v]] == T:
+                self.queue.append(v)
+            inblossom[v] = b
+
+    def augment(self, k: int) -> None:
+        # flips the two tree paths from the edge k to the roots, then the two trees are dissolved
+        endpoint, inblossom, labelend, mate = self.endpoint, self.inblossom, self.labelend, self.mate
+        v, w = self.heads[k], self.tails[k]
+        roots = (self.tree[inblossom[v]], self.tree[inblossom[w]])
+
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= self.n:
+                    self.augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= self.n:
+                    self.augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+        self.free_count -= 2
+        freed = []
+        for root in roots:
+            freed += self.dissolve(root)
+        self.rescan(freed)
+
+    def augment_blossom(self, b: int, v: int) -> None:
+        # the sub-blossoms are nested, so the recursion is kept on a stack of generators
+        stack = [self.augment_blossom_steps(b, v)]
+        while len(stack) > 0:
+            try:
+                stack.append(next(stack[-1]))
+            except StopIteration:
+                stack.pop()
+
+    def augment_blossom_steps(self, b: int, v: int) -> typing.Iterator[typing.Iterator]:
+        # flips the even path inside b from the vertex v to the base, so v becomes the base of b
+        endpoint, mate, childs, endps = self.endpoint, self.mate, self.blossomchilds[b], self.blossomendps[b]
+        t = v
+        while self.blossomparent[t] != b:
+            t = self.blossomparent[t]
+        if t >= self.n:
+            yield self.augment_blossom_steps(t, v)
+
+        i = j = childs.index(t)
+        if i & 1:
+            j -= len(childs)
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+
+        while j != 0:
+            j += jstep
+            t = childs[j]
+            p = endps[j - endptrick] ^ endptrick
+            if t >= self.n:
+                yield self.augment_blossom_steps(t, endpoint[p])
+            j += jstep
+            t = childs[j]
+            if t >= self.n:
+                yield self.augment_blossom_steps(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+
+        self.blossomchilds[b] = childs[i:] + childs[:i]
+        self.blossomendps[b] = endps[i:] + endps[:i]
+        self.blossombase[b] = self.blossombase[self.blossomchilds[b][0]]
+
+    def dissolve(self, root: int) -> list[int]:
+        # every top level blossom of the tree becomes free, and an S blossom with zero dual is expanded.
+        # returns the vertices of the tree
+        freed = []
+        for b in self.members.pop(root):
+            if self.tree[b] != root or self.blossomparent[b] != -1 or self.blossombase[b] < 0:
+                continue
+
+            self.tree[b] = -1
+            is_even = self.label[b] == S
+            vertices = self.leaves(b)
+            self.settle(b)
+            self.reset(b)
+            if is_even and b >= self.n and self.dualvar[b] == 0:
+                self.expand_free(b)
+            freed += vertices
+        return freed
+
+    def reset(self, b: int) -> None:
+        # clears the labels of b and of everything inside it
+        stack = [b]
+        while len(stack) > 0:
+            b = stack.pop()
+            self.label[b] = FREE
+            self.labelend[b] = -1
+            if b >= self.n:
+                stack.extend(self.blossomchilds[b])
+
+    def expand_free(self, b: int) -> None:
+        # expands the free blossom b and its sub-blossoms with zero dual
+        stack = [b]
+        while len(stack) > 0:
+            b = stack.pop()
+            for s in self.blossomchilds[b]:
+                self.blossomparent[s] = -1
+                self.since[s] = self.total
+                self.tree[s] = -1
+                if s < self.n:
+                    self.inblossom[s] = s
+                elif self.dualvar[s] == 0:
+                    stack.append(s)
+                else:
+                    for v in self.leaves(s):
+                        self.inblossom[v] = s
+            self.recycle(b)
+
+    def expand_odd(self, b: int) -> None:
+        # the T blossom b reached zero dual, the sub-blossoms on the even path from its entry to its base keep
+        # the tree going, and the others become free unless one of their vertices was reached
+        label, labelend, endpoint, mate = self.label, self.labelend, self.endpoint, self.mate
+        self.settle(b)
+        childs, endps = self.blossomchilds[b], self.blossomendps[b]
+        for s in childs:
+            self.blossomparent[s] = -1
+            self.since[s] = self.total
+            self.tree[s] = -1
+            if s < self.n:
+                self.inblossom[s] = s
+            else:
+                for v in self.leaves(s):
+                    self.inblossom[v] = s
+
+        entrychild = self.inblossom[endpoint[labelend[b] ^ 1]]
+        j = childs.index(entrychild)
+        if j & 1:
+            j -= len(childs)
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+
+        p = labelend[b]
+        while j != 0:
+            label[endpoint[p ^ 1]] = FREE
+            label[endpoint[endps[j - endptrick] ^ endptrick ^ 1]] = FREE
+            self.assign_label(endpoint[p ^ 1], T, p)
+            j += jstep
+            p = endps[j - endptrick] ^ endptrick
+            j += jstep
+
+        # the base sub-blossom is T without labeling its mate, which is outside b and already S
+        bv = childs[j]
+        label[endpoint[p ^ 1]] = label[bv] = T
+        labelend[endpoint[p ^ 1]] = labelend[bv] = p
+        self.join(bv, self.tree[self.inblossom[endpoint[p]]])
+        if bv >= self.n:
+            heapq.heappush(self.odd_heap, (self.dualvar[bv] + self.total, bv))
+
+        freed = []
+        j += jstep
+        while childs[j] != entrychild:
+            bv = childs[j]
+            j += jstep
+            if label[bv] == S:
+                continue
+
+            # a vertex that was reached by an S vertex that is no longer S does not count
+            reached = -1
+            for v in self.leaves(bv):
+                if label[v] != FREE:
+                    if label[self.inblossom[endpoint[labelend[v]]]] == S:
+                        reached = v
+                        break
+                    label[v] = FREE
+            if reached != -1:
+                label[reached] = FREE
+                label[endpoint[mate[self.blossombase[bv]]]] = FREE
+                self.assign_label(reached, T, labelend[reached])
+            else:
+                freed += self.leaves(bv)
+
+        self.recycle(b)
+        self.rescan(freed)
+
+    def recycle(self, b: int) -> None:
+        self.label[b] = self.labelend[b] = -1
+        self.blossomchilds[b] = self.blossomendps[b] = None
+        self.blossombase[b] = -1
+        self.tree[b] = -1
+        self.unused.append(b)
+
+    def rescan(self, freed: list[int]) -> None:
+        # the edges from S vertices to vertices that just became free
+        endpoint, inblossom, label, indptr, ends = self.endpoint, self.inblossom, self.label, self.indptr, self.ends
+        for v in freed:
+            for p in ends[indptr[v]:indptr[v + 1]]:
+                if label[inblossom[endpoint[p]]] == S:
+                    heapq.heappush(self.free_heap, (self.slack(p >> 1) + self.total, p >> 1))
@@ -1,40 +1,137 @@
-from typing import Any
+from typing import Any, Callable, Generator
+
+import abc
+import enum
+
+from functools import partial
 
 import networkx as nx
 
 from src.infra.step import Step
+from src.tracker.trace import NullTrace, Trace
 from src.tracker.tracker import Tracker
 
 
+StepFactory = Step | Callable[[], Step]
+StepGenerator = Generator[Step, None, Any]
+
+
+class RecordMode(enum.Enum):
+    OFF = 0
+    KEYFRAMES = 1
+    FULL = 2
+
+
 class Algo:
     tracker: Tracker
+    record_mode: RecordMode
+    trace: Trace
 
-    def __init__(self) -> None:
+    def __init__(self, record_mode: RecordMode = RecordMode.FULL) -> None:
         self.tracker = Tracker()
+        self.record_mode = record_mode
+        self.trace = NullTrace()
 
     def get_tracker(self) -> Tracker:
         return self.tracker
 
-    def add_step(self, step: Step) -> None:
-        self.tracker.add_step(step)
+    def set_tracker(self, tracker: Tracker) -> None:
+        self.tracker = tracker
+
+    def set_record_mode(self, record_mode: RecordMode) -> None:
+        self.record_mode = record_mode
+
+    def is_recording(self, keyframe: bool = False) -> bool:
+        if self.record_mode == RecordMode.OFF:
+            return False
+        return keyframe or self.record_mode == RecordMode.FULL
+
+    def build_step(self, step: StepFactory, keyframe: bool = False) -> Step | None:
+        # the step can be passed as factory, so it will not be built when it is not recorded
+        if not self.is_recording(keyframe):
+            return None
+
+        if not isinstance(step, Step):
+            step = step()
+
+        return step
+
+    def add_step(self, step: StepFactory, keyframe: bool = False) -> None:
+        step = self.build_step(step, keyframe)
+        if step is not None:
+            self.tracker.add_step(step)
+
+    def start_trace(self, graph: nx.Graph) -> Trace:
+        # the events are logged only when the algo is recorded, otherwise they are ignored
+        if self.is_recording(keyframe=True):
+            self.trace = Trace(graph)
+        else:
+            self.trace = NullTrace()
+        return self.trace
+
+    def frame_step(self, step_class: Callable[[Trace, int], Step]) -> StepFactory:
+        # ends the current frame of the trace, the step of the frame is built only when it is recorded
+        return partial(step_class, self.trace, self.trace.frame())
+
+    def emit(self, step: StepFactory, keyframe: bool = False) -> Generator[Step, None, None]:
+        # add_step for generated algos, used with yield from
+        step = self.build_step(step, keyframe)
+        if step is not None:
+            yield step
 
     def run(self, graph: nx.Graph, args: dict) -> Any:
         pass
 
+    def drain(self, steps: StepGenerator) -> Any:
+        # runs a generated algo to the end, with the steps added to the tracker
+        while True:
+            try:
+                step = next(steps)
+            except StopIteration as e:
+                return e.value
+            self.get_tracker().add_step(step)
+
+
+class ResumableAlgo(Algo, abc.ABC):
+    # a generated algo, which can be checkpointed between its steps and resumed from there by a lazy tracker
+    @abc.abstractmethod
+    def generate(self, graph: nx.Graph, args: dict) -> StepGenerator:
+        # yields the steps lazily and returns the result of the algo
+        pass
+
+    @abc.abstractmethod
+    def checkpoint(self) -> Any:
+        # the state of the algo after its last step, None when it can not be resumed from there yet
+        pass
+
+    @abc.abstractmethod
+    def resume(self, checkpoint: Any) -> StepGenerator:
+        # the steps of the algo after a checkpoint, and its result
+        pass
+
 
 class AlgoChecker(Algo):
     algo: Algo
 
     def __init__(self, algo: Algo) -> None:
-        super().__init__()
+        super().__init__(algo.record_mode)
 
         self.algo = algo
 
     def get_tracker(self) -> Tracker:
         return self.algo.get_tracker()
 
-    def add_step(self, step: Step) -> None:
-        self.algo.add_step(step)
+    def set_tracker(self, tracker: Tracker) -> None:
+        self.algo.set_tracker(tracker)
+
+    def set_record_mode(self, record_mode: RecordMode) -> None:
+        self.algo.set_record_mode(record_mode)
+
+    def is_recording(self, keyframe: bool = False) -> bool:
+        return self.algo.is_recording(keyframe)
+
+    def add_step(self, step: StepFactory, keyframe: bool = False) -> None:
+        self.algo.add_step(step, keyframe)
 
     def run(self, graph: nx.Graph, args: dict) -> Any:
         return self.checker(graph, args, self.algo.run(graph, args))
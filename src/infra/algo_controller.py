@@ -11,6 +11,13 @@ TestGenerator = Callable[..., list[tuple[nx.Graph, dict]]]
 TestParamOption = tuple[str] | tuple[str, Any] | tuple[str, Any, Callable[[str], Any]]
 
 
+def parse_bool(value: Any) -> bool:
+    # the checkbox of a bool param holds '1' or '0', and bool('0') is True
+    if isinstance(value, str):
+        return value == '1'
+    return bool(value)
+
+
 class AlgoTestParam:
     key: str
     default_value: Any
@@ -20,7 +27,7 @@ class AlgoTestParam:
         self.key = key
         self.default_value = default_value
         if converter is None:
-            self.converter = type(self.default_value)
+            self.converter = parse_bool if type(self.default_value) == bool else type(self.default_value)
         else:
             self.converter = converter
 
@@ -45,11 +52,20 @@ class AlgoController:
     name: str
     tests: list[AlgoTest]
     run: Callable[[], Algo]
+    lazy: bool
 
-    def __init__(self, name: str, run: Callable[[], Algo]):
+    def __init__(self, name: str, run: Callable[[], Algo], lazy: bool = False):
         self.name = name
         self.tests = []
         self.run = run
+        self.lazy = lazy
+
+    def create(self, args: dict) -> Algo:
+        # new algo for every generator, so the lazy tracker can restart it
+        algo = self.run()
+        if 'record' in args:
+            algo.set_record_mode(args['record'])
+        return algo
 
     def add_test(self, test_name: str, test_generator: TestGenerator, params: list[AlgoTestParam | TestParamOption]) -> None:
         self.tests.append(AlgoTest(test_name, test_generator, params))
@@ -0,0 +1,123 @@
+
+import typing
+
+from array import array
+
+import networkx as nx
+
+
+Node = typing.Any
+
+
+class CSRGraph:
+    # integer indexed adjacency of a graph, the neighbors of i are indices[indptr[i]:indptr[i + 1]]
+    # in the same order as graph.neighbors
+    nodes: list[Node]
+    index: dict[Node, int]
+    indptr: array
+    indices: array
+
+    def __init__(self, graph: nx.Graph | None = None) -> None:
+        if graph is None:
+            graph = nx.Graph()
+
+        self.nodes = list(graph.nodes())
+        self.index = {v: i for i, v in enumerate(self.nodes)}
+
+        self.indptr = array('q', [0])
+        self.indices = array('q')
+
+        index = self.index
+        adj = graph.adj
+        # when the nodes are already 0..n-1 in order, they are their own indices
+        identity = all(type(v) is int and v == i for i, v in enumerate(self.nodes))
+        for v in self.nodes:
+            if identity:
+                self.indices.extend(adj[v])
+            else:
+                self.indices.extend([index[w] for w in adj[v]])
+            self.indptr.append(len(self.indices))
+
+    @staticmethod
+    def from_edges(n: int, heads: array, tails: array) -> 'CSRGraph':
+        # the graph of the vertices 0..n-1 and the edges (heads[k], tails[k])
+        csr = CSRGraph()
+        csr.nodes = list(range(n))
+        csr.index = {v: v for v in range(n)}
+
+        indptr = array('q', [0]) * (n + 1)
+        for v in heads:
+            indptr[v + 1] += 1
+        for w in tails:
+            indptr[w + 1] += 1
+        for v in range(n):
+            indptr[v + 1] += indptr[v]
+
+        indices = array('q', [0]) * indptr[n]
+        position = indptr[:-1]
+        for k in range(len(heads)):
+            v, w = heads[k], tails[k]
+            indices[position[v]] = w
+            position[v] += 1
+            indices[position[w]] = v
+            position[w] += 1
+
+        csr.indptr = indptr
+        csr.indices = indices
+        return csr
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def neighbors(self, i: int) -> array:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def is_connected(self) -> bool:
+        if len(self.nodes) == 0:
+            return False
+
+        indptr, indices = self.indptr, self.indices
+        visited = bytearray(len(self.nodes))
+        visited[0] = 1
+        stack = [0]
+        count = 1
+        while len(stack) > 0:
+            v = stack.pop()
+            for w in indices[indptr[v]:indptr[v + 1]]:
+                if not visited[w]:
+                    visited[w] = 1
+                    count += 1
+                    stack.append(w)
+
+        return count == len(self.nodes)
+
+    def bfs(self, s: int, visited: bytearray | None = None) -> array:
+        # the vertices reachable from s in BFS order, skipping and marking the visited ones
+        indptr, indices = self.indptr, self.indices
+        if visited is None:
+            visited = bytearray(len(self.nodes))
+
+        visited[s] = 1
+        order = array('q', [s])
+        head = 0
+        while head < len(order):
+            v = order[head]
+            head += 1
+            for w in indices[indptr[v]:indptr[v + 1]]:
+                if not visited[w]:
+                    visited[w] = 1
+                    order.append(w)
+
+        return order
+
+    def components(self) -> tuple[array, array]:
+        # the vertices grouped by connected component, the component i is order[start[i]:start[i + 1]]
+        visited = bytearray(len(self.nodes))
+        order = array('q')
+        start = array('q', [0])
+        for s in range(len(self.nodes)):
+            if not visited[s]:
+                order.extend(self.bfs(s, visited))
+                start.append(len(order))
+
+        return order, start
@@ -0,0 +1,82 @@
+
+import typing
+import threading
+import weakref
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import networkx as nx
+
+
+Node = typing.Any
+Positions = dict[Node, typing.Any]
+LayoutKey = tuple[frozenset, frozenset]
+
+
+def graph_key(graph: nx.Graph) -> LayoutKey:
+    return frozenset(graph.nodes()), frozenset(frozenset(e) for e in graph.edges())
+
+
+class LayoutCache:
+    layouts: OrderedDict[LayoutKey, Future]
+    keys: weakref.WeakKeyDictionary
+    max_layouts: int
+
+    def __init__(self, max_layouts: int = 64, seed: int = 0) -> None:
+        self.layouts = OrderedDict()
+        self.keys = weakref.WeakKeyDictionary()
+        self.max_layouts = max_layouts
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="layout")
+
+    def get_key(self, graph: nx.Graph) -> LayoutKey:
+        # the steps copy the graph, so the layout is keyed by the structure and not only by the identity
+        key = self.keys.get(graph)
+        if key is None:
+            key = graph_key(graph)
+            self.keys[graph] = key
+        return key
+
+    def compute(self, graph: nx.Graph) -> Positions:
+        return nx.spring_layout(graph, seed=self.seed)
+
+    def request(self, graph: nx.Graph, background: bool) -> Future:
+        key = self.get_key(graph)
+
+        with self.lock:
+            if key in self.layouts:
+                self.layouts.move_to_end(key)
+                return self.layouts[key]
+
+            if background:
+                future = self.executor.submit(self.compute, graph.copy())
+            else:
+                future = Future()
+
+            self.layouts[key] = future
+            while len(self.layouts) > self.max_layouts:
+                self.layouts.popitem(last=False)
+
+        if not background:
+            try:
+                future.set_result(self.compute(graph))
+            except Exception as e:
+                future.set_exception(e)
+
+        return future
+
+    def prepare(self, graph: nx.Graph) -> None:
+        self.request(graph, background=True)
+
+    def get(self, graph: nx.Graph) -> Positions:
+        return self.request(graph, background=False).result()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.layouts.clear()
+
+
+layouts = LayoutCache()
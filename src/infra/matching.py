@@ -0,0 +1,101 @@
+
+import typing
+
+
+Node = typing.Any
+
+
+class Matching:
+    # a matching as the mate of every matched node, so mate, is_matched and contains are O(1).
+    # the edges keep the order and the direction they were added in, so (a, b) pairs of a bipartite graph stay (a, b)
+    edges: dict[Node, Node]
+    mates: dict[Node, Node]
+
+    def __init__(self, edges: typing.Iterable[typing.Iterable[Node]] = ()) -> None:
+        # from any iterable of pairs, like the old list[set] and set[tuple] formats
+        self.edges = {}
+        self.mates = {}
+
+        for e in edges:
+            v, w = e
+            self.add(v, w)
+
+    @staticmethod
+    def from_mates(nodes: list[Node], mate: typing.Sequence[int]) -> 'Matching':
+        # from a mate array over the indexes of the nodes, -1 for a free node
+        matching = Matching()
+        for v in range(len(mate)):
+            if mate[v] > v:
+                matching.add(nodes[v], nodes[mate[v]])
+        return matching
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __iter__(self) -> typing.Iterator[tuple[Node, Node]]:
+        return iter(self.edges.items())
+
+    def __contains__(self, e: typing.Iterable[Node]) -> bool:
+        v, w = e
+        return self.contains(v, w)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Matching):
+            return NotImplemented
+        return self.mates == other.mates
+
+    def __repr__(self) -> str:
+        return "Matching({})".format(list(self.edges.items()))
+
+    def mate(self, v: Node) -> Node | None:
+        return self.mates.get(v)
+
+    def is_matched(self, v: Node) -> bool:
+        return v in self.mates
+
+    def contains(self, v: Node, w: Node) -> bool:
+        return v in self.mates and self.mates[v] == w
+
+    def add(self, v: Node, w: Node) -> None:
+        if v == w or v in self.mates or w in self.mates:
+            raise ValueError("the edge ({}, {}) is not disjoint from the matching".format(v, w))
+
+        self.edges[v] = w
+        self.mates[v] = w
+        self.mates[w] = v
+
+    def remove(self, v: Node, w: Node) -> None:
+        if not self.contains(v, w):
+            raise KeyError((v, w))
+
+        del self.mates[v]
+        del self.mates[w]
+        if v in self.edges:
+            del self.edges[v]
+        else:
+            del self.edges[w]
+
+    def unmatch(self, v: Node) -> Node | None:
+        # removes the edge of v, returns the old mate
+        if v not in self.mates:
+            return None
+
+        w = self.mates[v]
+        self.remove(v, w)
+        return w
+
+    def copy(self) -> 'Matching':
+        return Matching(self)
+
+    # the old formats
+    def to_sets(self) -> list[set[Node]]:
+        return [{v, w} for v, w in self.edges.items()]
+
+    def to_tuples(self) -> set[tuple[Node, Node]]:
+        return set(self.edges.items())
+
+    def to_mates(self, index: dict[Node, int]) -> list[int]:
+        mate = [-1] * len(index)
+        for v, w in self.mates.items():
+            mate[index[v]] = index[w]
+        return mate
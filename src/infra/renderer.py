@@ -0,0 +1,121 @@
+
+import typing
+
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import networkx as nx
+import numpy as np
+
+from src.infra.layout import Positions, layouts
+
+
+Size = tuple[int, int]
+Color = typing.Any
+
+DEFAULT_SIZE: Size = (640, 480)
+DPI = 100
+
+
+def create_figure(size: Size | None) -> Figure:
+    if size is None:
+        size = DEFAULT_SIZE
+
+    # the figure is not registered in pyplot, so it is released with its owner
+    fig = Figure(figsize=(size[0] / DPI, size[1] / DPI), dpi=DPI)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def figure_to_image(fig: Figure) -> Image.Image:
+    if not isinstance(fig.canvas, FigureCanvasAgg):
+        FigureCanvasAgg(fig)
+
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+
+    # wrap the RGBA buffer of the canvas without encoding it
+    return Image.frombuffer('RGBA', (int(renderer.width), int(renderer.height)), fig.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+
+
+class GraphStyle:
+    graph: nx.Graph
+    pos: Positions
+    node_color: list[Color] | Color
+    edge_color: list[Color] | Color
+    text: str
+
+    def __init__(self, graph: nx.Graph, pos: Positions, node_color: list[Color] | Color = '#1f78b4',
+                 edge_color: list[Color] | Color = 'k', text: str = "") -> None:
+        self.graph = graph
+        self.pos = pos
+        self.node_color = node_color
+        self.edge_color = edge_color
+        self.text = text
+
+    def draw(self, ax) -> None:
+        nx.draw_networkx(self.graph, pos=self.pos, node_color=self.node_color, edge_color=self.edge_color, ax=ax)
+
+
+class GraphRenderer:
+    fig: Figure | None
+
+    def __init__(self) -> None:
+        self.fig = None
+        self.key = None
+        self.pos = None
+        self.directed = False
+        self.nodes_order = []
+        self.edges_order = []
+        self.nodes_artist = None
+        self.edges_artist = None
+
+    def build(self, style: GraphStyle, size: Size | None, key: typing.Any) -> None:
+        self.fig = create_figure(size)
+        self.key = key
+        self.pos = style.pos
+        # the edges of a directed graph are drawn as arrows, which can not be recolored
+        self.directed = style.graph.is_directed()
+
+        ax = self.fig.add_subplot()
+        self.nodes_order = list(style.graph.nodes())
+        self.edges_order = list(style.graph.edges())
+        self.nodes_artist = nx.draw_networkx_nodes(style.graph, style.pos, node_color=style.node_color, ax=ax)
+        self.edges_artist = nx.draw_networkx_edges(style.graph, style.pos, edge_color=style.edge_color, ax=ax)
+        nx.draw_networkx_labels(style.graph, style.pos, ax=ax)
+
+    def update(self, style: GraphStyle) -> None:
+        # only the colors are changed between the steps of the same graph
+        self.nodes_artist.set_facecolor(style.node_color)
+        if len(self.edges_order) > 0:
+            self.edges_artist.set_color(style.edge_color)
+
+    def same_positions(self, pos: Positions) -> bool:
+        # the positions can be a copy when the style is sent to another process
+        if pos is self.pos:
+            return True
+        return all(v in pos and np.array_equal(pos[v], self.pos[v]) for v in self.nodes_order)
+
+    def can_update(self, style: GraphStyle, key: typing.Any) -> bool:
+        return self.fig is not None and key == self.key and not style.graph.is_directed() and not self.directed \
+            and list(style.graph.nodes()) == self.nodes_order and list(style.graph.edges()) == self.edges_order \
+            and self.same_positions(style.pos)
+
+    def render(self, style: GraphStyle, size: Size | None) -> tuple[Image.Image, str]:
+        key = (layouts.get_key(style.graph), size)
+
+        if self.can_update(style, key):
+            self.update(style)
+        else:
+            self.build(style, size, key)
+
+        # the canvas buffer is reused by the next step, so the image is copied
+        return figure_to_image(self.fig).copy(), style.text
+
+    def clear(self) -> None:
+        self.fig = None
+        self.key = None
+        self.pos = None
+        self.directed = False
+        self.nodes_artist = None
+        self.edges_artist = None
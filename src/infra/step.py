@@ -1,51 +1,77 @@
+from __future__ import annotations
 
 import abc
 
-import io
-
 from PIL import Image, ImageTk
-import matplotlib.pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 import networkx as nx
 
+from src.infra.layout import Positions, layouts
+from src.infra.renderer import GraphRenderer, GraphStyle, Size, create_figure, figure_to_image
+
 
-DrawReturn = tuple[plt.Figure, str] | tuple[None, str]
+DrawReturn = tuple[Figure, str] | tuple[None, str]
 
 
 class Step(abc.ABC):
     @abc.abstractmethod
-    def compile(self) -> tuple[ImageTk.PhotoImage, str]:
+    def compile(self, size: Size | None = None, renderer: GraphRenderer | None = None) -> tuple[ImageTk.PhotoImage, str]:
         pass
 
 
 class PlotStep(Step):
     @abc.abstractmethod
-    def draw(self) -> DrawReturn:
+    def draw(self, ax: Axes) -> DrawReturn:
         pass
 
-    def compile(self) -> tuple[ImageTk.PhotoImage, str]:
-        fig, text = self.draw()
+    def layout(self, graph: nx.Graph) -> Positions:
+        # shared by all the steps of the same graph, override for a custom layout
+        return layouts.get(graph)
+
+    def render(self, size: Size | None = None, renderer: GraphRenderer | None = None) -> tuple[Image.Image, str]:
+        fig = create_figure(size)
+
+        draw_fig, text = self.draw(fig.add_subplot())
+        if draw_fig is not None:
+            fig = draw_fig
+
+        return figure_to_image(fig), text
+
+    def compile(self, size: Size | None = None, renderer: GraphRenderer | None = None) -> tuple[ImageTk.PhotoImage, str]:
+        img, text = self.render(size, renderer)
+        return ImageTk.PhotoImage(img), text
+
+    def get_render_job(self) -> PlotStep | GraphStyle:
+        # what is sent to the render workers
+        return self
+
+
+class StyledStep(PlotStep):
+    # step that only sets the colors of the graph, so the renderer can reuse the artists
+    @abc.abstractmethod
+    def style(self) -> GraphStyle:
+        pass
 
-        if fig is None:
-            fig = plt.gcf()
+    def draw(self, ax: Axes) -> DrawReturn:
+        style = self.style()
+        style.draw(ax)
+        return None, style.text
 
-        buf = io.BytesIO()
-        fig.savefig(buf)
-        buf.seek(0)
-        img = ImageTk.PhotoImage(Image.open(buf))
+    def render(self, size: Size | None = None, renderer: GraphRenderer | None = None) -> tuple[Image.Image, str]:
+        if renderer is None:
+            return super().render(size)
 
-        plt.figure().clear()
-        plt.close()
-        plt.cla()
-        plt.clf()
+        return renderer.render(self.style(), size)
 
-        return img, text
+    def get_render_job(self) -> GraphStyle:
+        return self.style()
 
 
-class GraphStep(PlotStep):
+class GraphStep(StyledStep):
     def __init__(self, graph: nx.Graph, text: str = ""):
         self.graph = graph.copy()
         self.text = text
 
-    def draw(self) -> DrawReturn:
-        nx.draw_networkx(self.graph)
-        return None, self.text
+    def style(self) -> GraphStyle:
+        return GraphStyle(self.graph, self.layout(self.graph), text=self.text)
@@ -10,16 +10,31 @@ from src.algo.brooks import BrooksAlgo
 from src.algo.tests import hungarian_tests
 from src.algo.tests import brooks_tests
 from src.algo.tests import edmonds_blossom_tests
+from src.algo.checkers.brooks_checker import BrooksAlgoChecker
 from src.algo.checkers.edmonds_blossom_checker import EdmondsBlossomAlgoChecker
+from src.algo.checkers.hungarian_checker import HungarianAlgoChecker
 
 
 def get_algo_controllers() -> list[AlgoController]:
-    dfs = AlgoController('DFS', DFSAlgo)
+    dfs = AlgoController('DFS', DFSAlgo, lazy=True)
 
-    hungarian = AlgoController('Hungarian', HungarianAlgo)
-    hungarian.add_test('Test Random Graphs', hungarian_tests.test_random_graph, [('min_n', 2), ('max_n', 5), ('p', 0.5), ('k', 3)])
+    hungarian = AlgoController('Hungarian', create_algo_checker(HungarianAlgo, HungarianAlgoChecker))
+    hungarian.add_test('Test Random Graphs', hungarian_tests.test_random_graph, [('min_n', 2), ('max_n', 5), ('p', 0.5), ('k', 3),
+                                                                                 ('hopcroft_karp', False)])
+    hungarian.add_test('Large Random Graph', hungarian_tests.test_large_random_graph, [('n', 100000), ('m', 100000), ('k', 500000),
+                                                                                       ('hopcroft_karp', True),
+                                                                                       ('warm_start', 'karp_sipser')])
+    hungarian.add_test('Bipartite Forest', hungarian_tests.test_bipartite_forest, [('k', 5000), ('max_n', 30), ('p', 0.15),
+                                                                                    ('workers', 0)])
+    hungarian.add_test('Weighted Graphs', hungarian_tests.test_random_weighted_graph, [('min_n', 2), ('max_n', 5), ('p', 0.5), ('k', 3),
+                                                                                       ('maximize', False)])
+    hungarian.add_test('Batch', hungarian_tests.test_batch, [('k', 200), ('max_n', 8), ('p', 0.4), ('assignment', 'min')])
+    hungarian.add_test('Dynamic', hungarian_tests.test_dynamic, [('n', 30), ('p', 0.1), ('edits', 200)])
+    hungarian.add_test('Cost Matrix', hungarian_tests.test_random_cost_matrix, [('n', 2000), ('m', 2000), ('maximize', False)])
+    hungarian.add_test('Auction', hungarian_tests.test_auction_graph, [('n', 100000), ('degree', 20), ('maximize', True),
+                                                                       ('epsilon', 1.0), ('workers', 0)])
 
-    brooks = AlgoController('Brooks', BrooksAlgo)
+    brooks = AlgoController('Brooks', create_algo_checker(BrooksAlgo, BrooksAlgoChecker))
     brooks.add_test('Test Random Graphs', brooks_tests.test_random_graphs, [('draw', True), ('min_n', 1), ('max_n', 10), ('p', 0.2),
                                                                             ('k_iter', 3)])
     brooks.add_test('2 Degree Graph', brooks_tests.test_2_degree_graph, [('draw', True), ('min_n', 1), ('max_n', 10)])
@@ -28,12 +43,24 @@ def get_algo_controllers() -> list[AlgoController]:
     brooks.add_test('k-Regular', brooks_tests.test_k_regular, [('draw', True), ('n', 12), ('k', 4), ('to_remove', 0)])
     brooks.add_test('k-Regular min cut of 1', brooks_tests.test_k_regular_min_cut_one, [('draw', True), ('k', 4), ('n_blocks', 2),
                                                                                         ('max_block_nodes', 16)])
+    brooks.add_test('k-Regular min cut of 1 Large', brooks_tests.test_k_regular_min_cut_one, [('draw', False), ('k', 4),
+                                                                                              ('n_blocks', 300),
+                                                                                              ('max_block_nodes', 16)])
+    brooks.add_test('Random Regular', brooks_tests.test_random_regular, [('draw', False), ('n', 8), ('k', 3), ('k_iter', 50)])
     brooks.add_test('E2E', brooks_tests.test_e2e, [('draw', False)])
     brooks.add_test('E2E Large', brooks_tests.test_e2e_large, [('draw', False)])
 
     edmonds = AlgoController('Edmonds', create_algo_checker(EdmondsBlossomAlgo, EdmondsBlossomAlgoChecker))
     edmonds.add_test('Test Random Graphs', edmonds_blossom_tests.test_random_graphs, [('min_n', 1), ('max_n', 10), ('p', '0.2', float),
-                                                                                      ('k_iter', 3)])
+                                                                                      ('k_iter', 3), ('warm_start', '')])
+    edmonds.add_test('Weighted Graphs', edmonds_blossom_tests.test_random_weighted_graphs, [('min_n', 1), ('max_n', 10),
+                                                                                            ('p', '0.4', float), ('k_iter', 3),
+                                                                                            ('max_weight', 10),
+                                                                                            ('maxcardinality', False)])
+    edmonds.add_test('Large Weighted Graph', edmonds_blossom_tests.test_large_weighted_graph, [('n', 3000), ('degree', 6),
+                                                                                               ('max_weight', 1000)])
+    edmonds.add_test('Forest', edmonds_blossom_tests.test_forest, [('k', 200), ('max_n', 40), ('p', '0.1', float), ('workers', 0),
+                                                                   ('weighted', False)])
     edmonds.add_test('Test 1', edmonds_blossom_tests.test1, [])
     edmonds.add_test('Test 2', edmonds_blossom_tests.test2, [])
     edmonds.add_test('Test 3', edmonds_blossom_tests.test3, [])
@@ -91,3 +91,6 @@ class Frame:
 
     def leave(self):
         pass
+
+    def close(self):
+        pass
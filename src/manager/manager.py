@@ -32,6 +32,9 @@ class Manager:
     def run(self) -> None:
         self.window.mainloop()
 
+        for frame in self.frames:
+            frame.close()
+
     def change_frame(self, index: int, args: dict):
         self.frames[self.displayed_frame].leave()
         self.displayed_frame = index
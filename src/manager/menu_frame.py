@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING
 from functools import partial
 
 import tkinter as tk
+from tkinter import filedialog
 
 from src.manager.frame import Frame
 
@@ -26,9 +27,17 @@ class MenuFrame(Frame):
 
             y += 60
 
+        open_btn = tk.Button(self.content, text="Open Archive", command=partial(MenuFrame.open_btn_handler, self))
+        open_btn.place(x=self.manager.window_width / 2 - 30, y=y)
+
     def leave(self):
         self.hide()
 
     def algo_btn_handler(self, controller_index: int) -> None:
         self.manager.current_controller = controller_index
         self.manager.change_frame(1, {})
+
+    def open_btn_handler(self) -> None:
+        paths = filedialog.askopenfilenames(filetypes=[("Tracker Archive", "*.trk")])
+        if len(paths) > 0:
+            self.manager.change_frame(3, {"archives": list(paths)})
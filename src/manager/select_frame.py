@@ -5,7 +5,7 @@ from functools import partial
 
 import tkinter as tk
 
-from src.infra.algo_controller import AlgoTest
+from src.infra.algo_controller import AlgoTest, parse_bool
 from src.manager.frame import Frame
 
 
@@ -56,10 +56,11 @@ class SelectFrame(Frame):
                 x += label.winfo_width() + 5
 
                 text_box = tk.StringVar()
-                text_box.set(test_param.converter(test_param.default_value))
-                if test_param.converter == bool:
+                if test_param.converter == parse_bool:
+                    text_box.set('1' if parse_bool(test_param.default_value) else '0')
                     entry = tk.Checkbutton(self.content, text='', variable=text_box, onvalue='1', offvalue='0')
                 else:
+                    text_box.set(test_param.converter(test_param.default_value))
                     entry = tk.Entry(self.content, textvariable=text_box, width=8)
                 entry.pack()
                 entry.place(x=x, y=y)
@@ -5,8 +5,13 @@ from functools import partial
 
 import networkx as nx
 import tkinter as tk
+from tkinter import filedialog
 
+from src.infra.layout import layouts
 from src.manager.frame import Frame
+from src.tracker.archive import ArchiveTracker, save_tracker
+from src.tracker.lazy_tracker import LazyTracker
+from src.tracker.render_pool import RenderPool
 from src.tracker.tracker import Tracker
 
 
@@ -16,6 +21,11 @@ if TYPE_CHECKING:
 
 class TrackerFrame(Frame):
     trackers: list[Tracker]
+    trackers_graphs: list[nx.Graph | None]
+    algo_inputs: list[tuple[nx.Graph, dict]]
+    running_label: tk.Label | None
+    drop: tk.OptionMenu | None
+    render_pool: RenderPool
     selected_tracker: tk.StringVar | None = None
     selected_tracker_index: int = 0
     selected_step: tk.StringVar | None = None
@@ -30,52 +40,125 @@ class TrackerFrame(Frame):
         super().__init__(manager)
 
         self.trackers = []
+        self.trackers_graphs = []
         self.selected_step_index = []
 
+        self.algo_inputs = []
+        self.next_input_index = 0
+        self.running_label = None
+        self.drop = None
+        self.render_pool = RenderPool()
+        # changed on every enter, so the callbacks of the previous enter are ignored
+        self.session = 0
+
     def enter(self, args: dict) -> None:
         self.show()
 
         self.trackers = []
+        self.trackers_graphs = []
         self.selected_step_index = []
+        self.selected_tracker_index = 0
+        self.canvas = None
+        self.session += 1
 
-        controller = self.manager.algo_controllers[self.manager.current_controller]
-        algo_inputs: list[tuple[nx.Graph, dict]] = args["algo_inputs"]
+        self.algo_inputs = args.get("algo_inputs", [])
+        self.next_input_index = 0
+
+        # the saved archives are opened without running the algo
+        for path in args.get("archives", []):
+            tracker = ArchiveTracker(path)
+            if tracker.has_step(0):
+                self.add_tracker(tracker, tracker.graph)
 
-        if len(algo_inputs) == 0:
+        if len(self.algo_inputs) == 0 and len(self.trackers) == 0:
             self.manager.change_frame(0, {})
             return
 
-        # running the algo on inputs
+        if len(self.trackers) > 0:
+            self.present_results()
+            self.manager.window.after_idle(partial(TrackerFrame.run_next_input, self, self.session))
+            self.manager.window.after(50, partial(TrackerFrame.poll_render_pool, self, self.session))
+            return
+
+        # running the algo on inputs, the results are presented when the first tracker is ready
         self.content.update()
 
-        running_label = tk.Label(self.content, text="Running")
-        running_label.pack()
-        running_label.place(x=self.content.winfo_width() / 2 - 20, y=self.content.winfo_height() / 2)
-        running_label.update()
+        self.running_label = tk.Label(self.content, text="Running")
+        self.running_label.pack()
+        self.running_label.place(x=self.content.winfo_width() / 2 - 20, y=self.content.winfo_height() / 2)
+        self.running_label.update()
+
+        self.manager.window.after_idle(partial(TrackerFrame.run_next_input, self, self.session))
+        self.manager.window.after(50, partial(TrackerFrame.poll_render_pool, self, self.session))
 
-        for algo_input_index in range(len(algo_inputs)):
-            graph, args = algo_inputs[algo_input_index]
+    def close(self):
+        self.render_pool.shutdown()
+
+    def run_next_input(self, session: int) -> None:
+        if not self.showed or session != self.session:
+            return
+
+        if self.next_input_index >= len(self.algo_inputs):
+            if len(self.trackers) == 0:
+                self.running_label.configure(text="Ended without trackers!")
+            return
+
+        controller = self.manager.algo_controllers[self.manager.current_controller]
 
-            running_label.configure(text="Running - {} / {}".format(algo_input_index, len(algo_inputs)))
-            running_label.update()
+        algo_input_index = self.next_input_index
+        self.next_input_index += 1
+        graph, args = self.algo_inputs[algo_input_index]
 
-            # run the algo
+        if self.running_label is not None:
+            self.running_label.configure(text="Running - {} / {}".format(algo_input_index, len(self.algo_inputs)))
+            self.running_label.update()
+
+        # the layout is computed in the background while the algo is running
+        layouts.prepare(graph)
+
+        # run the algo, a lazy algo is advanced only when its steps are requested
+        if controller.lazy:
+            tracker = LazyTracker(partial(controller.create, args), graph, args)
+        else:
             algo = controller.run()
+            if 'record' in args:
+                algo.set_record_mode(args['record'])
             res = algo.run(graph, args)
             print(res)
 
             tracker = algo.get_tracker()
-            if len(tracker.steps) > 0:
-                self.trackers.append(tracker)
-                self.selected_step_index.append(0)
 
-        if len(self.trackers) == 0:
-            running_label.configure(text="Ended without trackers!")
+        if tracker.has_step(0):
+            self.add_tracker(tracker, graph)
+
+            if self.canvas is None:
+                self.running_label.destroy()
+                self.running_label = None
+                self.present_results()
+            else:
+                label = str(len(self.trackers))
+                self.drop['menu'].add_command(label=label, command=tk._setit(self.selected_tracker, label))
+
+        self.manager.window.after(1, partial(TrackerFrame.run_next_input, self, session))
+
+    def add_tracker(self, tracker: Tracker, graph: nx.Graph | None) -> None:
+        tracker.set_pool(self.render_pool)
+        self.trackers.append(tracker)
+        self.trackers_graphs.append(graph)
+        self.selected_step_index.append(0)
+
+    def poll_render_pool(self, session: int) -> None:
+        if not self.showed or session != self.session:
             return
 
-        running_label.destroy()
+        for tracker_index in range(len(self.trackers)):
+            done = self.trackers[tracker_index].collect()
+            if self.canvas is not None and tracker_index == self.get_tracker_index() and self.get_step_index() in done:
+                self.update_borad()
 
+        self.manager.window.after(50, partial(TrackerFrame.poll_render_pool, self, session))
 
+    def present_results(self) -> None:
         # present the results
         self.selected_tracker = tk.StringVar()
         self.selected_tracker.set('1')
@@ -94,11 +177,11 @@ class TrackerFrame(Frame):
         label.update()
         x += label.winfo_width() + self.tab_w
 
-        drop = tk.OptionMenu(self.menubar, self.selected_tracker, *[str(i+1) for i in range(len(self.trackers))])
-        drop.pack()
-        drop.place(x=x, y=self.tab_h)
-        drop.update()
-        x += drop.winfo_width() + self.tab_w
+        self.drop = tk.OptionMenu(self.menubar, self.selected_tracker, *[str(i+1) for i in range(len(self.trackers))])
+        self.drop.pack()
+        self.drop.place(x=x, y=self.tab_h)
+        self.drop.update()
+        x += self.drop.winfo_width() + self.tab_w
 
         btn = tk.Button(self.menubar, text="Prev Graph", bg="blue", command=partial(self.prev_tracker_handler, self))
         btn.pack()
@@ -137,6 +220,12 @@ class TrackerFrame(Frame):
         btn.update()
         x += btn.winfo_width() + self.tab_w
 
+        btn = tk.Button(self.menubar, text="Save", command=partial(TrackerFrame.save_handler, self))
+        btn.pack()
+        btn.place(x=x, y=self.tab_h)
+        btn.update()
+        x += btn.winfo_width() + self.tab_w
+
         # create content
         self.content.update()
 
@@ -152,6 +241,13 @@ class TrackerFrame(Frame):
     def leave(self):
         self.hide()
 
+        for tracker in self.trackers:
+            tracker.close()
+
+        self.canvas = None
+        self.running_label = None
+        self.drop = None
+
         if self.selected_tracker is not None:
             self.selected_tracker.set('')
             self.selected_tracker = None
@@ -200,8 +296,8 @@ class TrackerFrame(Frame):
             num = int(self.selected_step.get()) - 1
             if num < 0:
                 self.selected_step_index[self.get_tracker_index()] = 0
-            elif num >= len(self.trackers[self.get_tracker_index()].steps):
-                self.selected_step_index[self.get_tracker_index()] = len(self.trackers[self.get_tracker_index()].steps) - 1
+            elif not self.trackers[self.get_tracker_index()].has_step(num):
+                self.selected_step_index[self.get_tracker_index()] = self.trackers[self.get_tracker_index()].step_count() - 1
             else:
                 self.selected_step_index[self.get_tracker_index()] = num
                 self.update_borad()
@@ -216,10 +312,23 @@ class TrackerFrame(Frame):
         if not self.showed:
             return
 
-        img, text = self.trackers[self.get_tracker_index()].steps[self.get_step_index()]
-
         self.canvas.update()
 
+        tracker = self.trackers[self.get_tracker_index()]
+        tracker.set_size((self.canvas.winfo_width(), self.canvas.winfo_height()))
+
+        # wait for the render pool, the board is updated when the step arrives. a step that failed in the pool is
+        # not requested again and is compiled below in the main thread
+        tracker.collect()
+        if tracker.pool is not None and not tracker.is_ready(self.get_step_index()):
+            tracker.request(self.get_step_index())
+            if self.get_step_index() in tracker.pending:
+                tracker.prefetch(self.get_step_index())
+                self.text_var.set("Rendering...")
+                return
+
+        img, text = tracker.get_step(self.get_step_index())
+
         x = int(self.canvas.winfo_width() / 2)
         y = int(self.canvas.winfo_height() / 2)
 
@@ -233,6 +342,15 @@ class TrackerFrame(Frame):
 
         self.text_var.set(text)
 
+        # render the nearby steps while the user is looking on the current one
+        self.manager.window.after_idle(partial(TrackerFrame.prefetch_steps, self))
+
+    def prefetch_steps(self):
+        if not self.showed or len(self.trackers) == 0:
+            return
+
+        self.trackers[self.get_tracker_index()].prefetch(self.get_step_index())
+
     def prev_tracker_handler(self, event: tk.Event):
         if not self.showed:
             return
@@ -272,9 +390,31 @@ class TrackerFrame(Frame):
         j = self.get_tracker_index()
         i = self.get_step_index() + 1
 
-        if i < len(self.trackers[j].steps):
+        if self.trackers[j].has_step(i):
             self.selected_step_index[j] = i
             self.selected_step.set(str(i + 1))
             self.update_borad()
 
+    def save_handler(self):
+        if not self.showed:
+            return
+
+        path = filedialog.asksaveasfilename(defaultextension=".trk", filetypes=[("Tracker Archive", "*.trk")])
+        if not path:
+            return
+
+        self.text_var.set("Saving...")
+        self.text_bord.update()
+
+        # the frames are saved in the size of the board, so the archive is shown as it is now
+        j = self.get_tracker_index()
+        controller_name = ""
+        if 0 <= self.manager.current_controller < len(self.manager.algo_controllers):
+            controller_name = self.manager.algo_controllers[self.manager.current_controller].name
+        try:
+            count = save_tracker(self.trackers[j], path, self.trackers_graphs[j], controller_name)
+        except Exception as e:
+            self.text_var.set("Failed to save to {}: {}".format(path, e))
+            return
 
+        self.text_var.set("Saved {} steps to {}".format(count, path))
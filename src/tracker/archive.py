@@ -0,0 +1,202 @@
+
+import json
+import mmap
+import os
+import struct
+import typing
+import zlib
+
+from PIL import Image, ImageTk
+import networkx as nx
+
+from src.infra.renderer import DEFAULT_SIZE, GraphRenderer, Size
+from src.infra.step import PlotStep, Step
+from src.tracker.render_pool import RenderPool
+from src.tracker.tracker import Tracker
+
+
+# the archive is the magic, the compressed RGBA frames one after the other,
+# the compressed JSON index and a footer with the offset and the length of the index.
+# the index is plain data, so opening an archive never runs code from the file
+MAGIC = b'ALGOTRK1'
+FOOTER = struct.Struct('<QQ')
+VERSION = 2
+
+FrameEntry = tuple[int, int, Size, str]
+
+
+def encode_node(node: typing.Any) -> typing.Any:
+    if isinstance(node, tuple):
+        return [encode_node(v) for v in node]
+    if node is None or isinstance(node, (bool, int, float, str)):
+        return node
+    raise TypeError("only nodes of numbers, strings and tuples can be archived: {!r}".format(node))
+
+
+def decode_node(value: typing.Any) -> typing.Any:
+    if isinstance(value, list):
+        return tuple(decode_node(v) for v in value)
+    return value
+
+
+def graph_to_json(graph: nx.Graph | None) -> dict | None:
+    # the nodes, and the edges as pairs of node indexes with their attributes of plain values
+    if graph is None:
+        return None
+
+    index = {v: i for i, v in enumerate(graph.nodes())}
+    edges = []
+    for v, w, data in graph.edges(data=True):
+        attrs = {key: value for key, value in data.items()
+                 if isinstance(key, str) and isinstance(value, (bool, int, float, str))}
+        edges.append([index[v], index[w], attrs])
+
+    return {'nodes': [encode_node(v) for v in graph.nodes()], 'edges': edges}
+
+
+def graph_from_json(data: dict | None) -> nx.Graph | None:
+    if data is None:
+        return None
+
+    nodes = [decode_node(v) for v in data['nodes']]
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes)
+    for v, w, attrs in data['edges']:
+        graph.add_edge(nodes[v], nodes[w], **attrs)
+    return graph
+
+
+def save_tracker(tracker: Tracker, path: str, graph: nx.Graph | None = None, name: str = "",
+                 size: Size | None = None, level: int = 6) -> int:
+    # render all the steps of the tracker into an archive, returns the number of frames
+    if size is None:
+        size = tracker.size if tracker.size is not None else DEFAULT_SIZE
+
+    renderer = GraphRenderer()
+    frames: list[FrameEntry] = []
+
+    # the archive is written next to the path and replaces it only when it is complete
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(MAGIC)
+
+            index = 0
+            while tracker.has_step(index):
+                step = tracker.load_step(index)
+                if not isinstance(step, (PlotStep, ArchivedStep)):
+                    raise TypeError("only plot steps can be archived")
+
+                img, text = step.render(size, renderer)
+                blob = zlib.compress(img.tobytes(), level)
+                frames.append((file.tell(), len(blob), img.size, text))
+                file.write(blob)
+                index += 1
+
+            meta = {'version': VERSION, 'name': name, 'graph': graph_to_json(graph), 'frames': frames}
+            index_blob = zlib.compress(json.dumps(meta).encode('utf-8'), level)
+            index_offset = file.tell()
+            file.write(index_blob)
+            file.write(FOOTER.pack(index_offset, len(index_blob)))
+
+        os.replace(tmp_path, path)
+    finally:
+        # a failed archive does not leave its partial file behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return len(frames)
+
+
+class TrackerArchive:
+    # read only view of an archive, the frames are decompressed from the memory map when they are requested
+    path: str
+    name: str
+    graph: nx.Graph | None
+    frames: list[FrameEntry]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self.data) < len(MAGIC) + FOOTER.size or self.data[:len(MAGIC)] != MAGIC:
+                raise ValueError("not a tracker archive: {}".format(path))
+
+            index_offset, index_length = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+            meta: dict[str, typing.Any] = json.loads(zlib.decompress(self.data[index_offset:index_offset + index_length]))
+            if not isinstance(meta, dict) or meta.get('version') != VERSION:
+                raise ValueError("unsupported tracker archive version: {}".format(path))
+
+            self.name = str(meta['name'])
+            self.graph = graph_from_json(meta['graph'])
+            self.frames = [(int(offset), int(length), (int(size[0]), int(size[1])), str(text))
+                           for offset, length, size, text in meta['frames']]
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def text(self, index: int) -> str:
+        return self.frames[index][3]
+
+    def image(self, index: int) -> Image.Image:
+        offset, length, size, _ = self.frames[index]
+        return Image.frombytes('RGBA', size, zlib.decompress(self.data[offset:offset + length]))
+
+    def close(self) -> None:
+        if not self.data.closed:
+            self.data.close()
+        self.file.close()
+
+
+class ArchivedStep(Step):
+    def __init__(self, archive: TrackerArchive, index: int) -> None:
+        self.archive = archive
+        self.index = index
+
+    def render(self, size: Size | None = None, renderer: GraphRenderer | None = None) -> tuple[Image.Image, str]:
+        # the frame is shown in the size it was saved, it is never rendered again
+        return self.archive.image(self.index), self.archive.text(self.index)
+
+    def compile(self, size: Size | None = None, renderer: GraphRenderer | None = None) -> tuple[ImageTk.PhotoImage, str]:
+        img, text = self.render(size, renderer)
+        return ImageTk.PhotoImage(img), text
+
+
+class ArchiveTracker(Tracker):
+    # tracker of a saved archive, there is no algo to run and nothing to render
+    archive: TrackerArchive
+
+    def __init__(self, path: str, cache_size: int = 16, prefetch_radius: int = 1):
+        super().__init__(cache_size, prefetch_radius)
+
+        self.archive = TrackerArchive(path)
+        self.graph = self.archive.graph
+
+    def add_step(self, step: Step):
+        raise TypeError("the steps of an archive tracker are read from the archive")
+
+    def step_count(self) -> int:
+        return len(self.archive)
+
+    def has_step(self, index: int) -> bool:
+        return 0 <= index < len(self.archive)
+
+    def load_step(self, index: int) -> Step:
+        return ArchivedStep(self.archive, index)
+
+    def set_size(self, size: Size) -> None:
+        # the frames have a fixed size, so the cache is kept
+        self.size = size
+
+    def set_pool(self, pool: RenderPool | None) -> None:
+        # the frames are only decompressed, so they are not sent to the render pool
+        super().set_pool(None)
+
+    def close(self) -> None:
+        super().close()
+        self.archive.close()
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from typing import Any, Callable
+
+import networkx as nx
+
+from src.infra.algo import ResumableAlgo, StepGenerator
+from src.infra.step import Step
+from src.tracker.tracker import Tracker
+
+
+class LazyTracker(Tracker):
+    # tracker of a generated algo, the algo is advanced only as far as the steps are requested
+    factory: Callable[[], ResumableAlgo]
+    algo: ResumableAlgo | None
+    generator: StepGenerator | None
+    window: OrderedDict[int, Step]
+    checkpoints: dict[int, Any]
+
+    def __init__(self, factory: Callable[[], ResumableAlgo], graph: nx.Graph, args: dict, window_size: int = 64,
+                 checkpoint_interval: int = 64, max_checkpoints: int = 16, cache_size: int = 16, prefetch_radius: int = 1):
+        super().__init__(cache_size, prefetch_radius)
+
+        self.factory = factory
+        self.graph = graph
+        self.args = args
+        self.algo = None
+        self.generator = None
+        self.window_size = max(window_size, self.cache_size)
+
+        # the algo is checkpointed every checkpoint_interval steps, the interval is doubled whenever there are more
+        # than max_checkpoints of them, so they stay spread over all the steps
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+
+        # the index of the next step of the generator
+        self.position = 0
+        self.window = OrderedDict()
+        # the index of the step after the checkpoint, to the checkpoint
+        self.checkpoints = {}
+
+        self.total: int | None = None
+        self.result: Any = None
+
+    def add_step(self, step: Step):
+        raise TypeError("the steps of a lazy tracker are generated by the algo")
+
+    def step_count(self) -> int:
+        if self.total is not None:
+            return self.total
+        return self.position
+
+    def has_step(self, index: int) -> bool:
+        if index < 0:
+            return False
+        if self.total is not None:
+            return index < self.total
+
+        while self.position <= index:
+            if not self.advance():
+                return False
+        return True
+
+    def load_step(self, index: int) -> Step:
+        if index in self.window:
+            self.window.move_to_end(index)
+            return self.window[index]
+
+        if not self.has_step(index):
+            raise IndexError("step index out of range")
+
+        # seek back by resuming the algo from the nearest checkpoint before the step
+        if index < self.position:
+            self.seek(index)
+
+        while self.position <= index:
+            self.advance()
+
+        return self.window[index]
+
+    def seek(self, index: int) -> None:
+        position = max([i for i in self.checkpoints if i <= index], default=0)
+        if position == 0:
+            self.restart()
+            return
+
+        if self.generator is not None:
+            self.generator.close()
+        self.algo = self.factory()
+        self.generator = self.algo.resume(self.checkpoints[position])
+        self.position = position
+
+    def advance(self) -> bool:
+        if self.generator is None:
+            if self.total is not None and self.position >= self.total:
+                return False
+            self.algo = self.factory()
+            self.generator = self.algo.generate(self.graph, self.args)
+
+        try:
+            step = next(self.generator)
+        except StopIteration as e:
+            self.total = self.position
+            self.result = e.value
+            self.generator = None
+            return False
+
+        index = self.position
+        self.position += 1
+
+        self.window[index] = step
+        while len(self.window) > self.window_size:
+            self.window.popitem(last=False)
+
+        if self.position % self.checkpoint_interval == 0:
+            self.add_checkpoint()
+
+        return True
+
+    def add_checkpoint(self) -> None:
+        if self.position in self.checkpoints:
+            return
+
+        checkpoint = self.algo.checkpoint()
+        if checkpoint is None:
+            return
+
+        self.checkpoints[self.position] = checkpoint
+        if len(self.checkpoints) > self.max_checkpoints:
+            self.checkpoint_interval *= 2
+            self.checkpoints = {i: c for i, c in self.checkpoints.items() if i % self.checkpoint_interval == 0}
+
+    def restart(self) -> None:
+        if self.generator is not None:
+            self.generator.close()
+        self.algo = None
+        self.generator = None
+        self.position = 0
+
+    def clear_cache(self) -> None:
+        super().clear_cache()
+        self.restart()
+        self.window.clear()
@@ -0,0 +1,61 @@
+
+import multiprocessing
+import os
+
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from PIL import Image, ImageTk
+
+from src.infra.renderer import GraphRenderer, GraphStyle, Size
+from src.infra.step import PlotStep
+
+
+RenderJob = PlotStep | GraphStyle
+RenderResult = tuple[bytes, Size, str]
+
+# the renderer of the worker process, reused between the jobs of the same graph
+worker_renderer: GraphRenderer | None = None
+
+
+def init_worker() -> None:
+    global worker_renderer
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    worker_renderer = GraphRenderer()
+
+
+def render_job(job: RenderJob, size: Size | None) -> RenderResult:
+    if isinstance(job, GraphStyle):
+        img, text = worker_renderer.render(job, size)
+    else:
+        img, text = job.render(size)
+
+    return img.tobytes(), img.size, text
+
+
+def result_to_image(result: RenderResult) -> tuple[ImageTk.PhotoImage, str]:
+    data, size, text = result
+    return ImageTk.PhotoImage(Image.frombuffer('RGBA', size, data, 'raw', 'RGBA', 0, 1)), text
+
+
+class RenderPool:
+    executor: ProcessPoolExecutor | None
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers if max_workers is not None else max(1, os.cpu_count() or 1)
+        self.executor = None
+
+    def submit(self, step: PlotStep, size: Size | None) -> Future:
+        # the workers are started only when there is something to render
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=init_worker)
+
+        return self.executor.submit(render_job, step.get_render_job(), size)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
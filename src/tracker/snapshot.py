@@ -0,0 +1,45 @@
+
+from __future__ import annotations
+
+import typing
+
+import networkx as nx
+
+
+Node = typing.Any
+Edge = frozenset
+
+
+def edge_key(v: Node, w: Node) -> Edge:
+    return frozenset((v, w))
+
+
+class Snapshot:
+    graph: nx.Graph | None
+    current: Node | None
+    node_states: dict[Node, typing.Any]
+    edge_states: dict[Edge, typing.Any]
+    frontier: list[Node]
+    text: str
+
+    def __init__(self) -> None:
+        self.graph = None
+        self.current = None
+        self.node_states = {}
+        self.edge_states = {}
+        # the top of the frontier is the last item
+        self.frontier = []
+        self.text = ""
+
+    def copy(self) -> Snapshot:
+        snapshot = Snapshot()
+        snapshot.graph = self.graph
+        snapshot.current = self.current
+        snapshot.node_states = self.node_states.copy()
+        snapshot.edge_states = self.edge_states.copy()
+        snapshot.frontier = self.frontier.copy()
+        snapshot.text = self.text
+        return snapshot
+
+    def size(self) -> int:
+        return len(self.node_states) + len(self.edge_states) + len(self.frontier)
@@ -0,0 +1,258 @@
+
+from __future__ import annotations
+
+import bisect
+import typing
+
+from array import array
+
+import networkx as nx
+
+from src.tracker.snapshot import Snapshot, edge_key
+
+
+Node = typing.Any
+
+# the kinds of the events in the log
+NODE_STATE = 0
+EDGE_STATE = 1
+TEXT = 2
+CURRENT = 3
+PUSH = 4
+POP = 5
+GRAPH = 6
+
+NONE_ID = -1
+
+
+class Trace:
+    # array-backed log of events, every event is (kind, target, value) of interned ids
+    kinds: array
+    targets: array
+    values: array
+    frames: array
+    symbols: list[typing.Any]
+    symbols_ids: dict[typing.Any, int]
+
+    def __init__(self, graph: nx.Graph, min_checkpoint_interval: int = 16, base: Snapshot | None = None) -> None:
+        self.kinds = array('b')
+        self.targets = array('q')
+        self.values = array('q')
+        self.frames = array('q')
+
+        self.symbols = []
+        self.symbols_ids = {}
+
+        self.source: nx.Graph | None = None
+        self.graph: nx.Graph | None = None
+
+        # the state before the first event, a rebased trace goes on from the state of the trace before it
+        self.base = base
+        if base is None:
+            self.set_graph(graph)
+        else:
+            self.source = graph
+            self.graph = base.graph
+
+        # the checkpoints of the fold are created while replaying
+        self.min_checkpoint_interval = min_checkpoint_interval
+        self.checkpoints: dict[int, Snapshot] = {}
+        self.checkpoints_indexes: list[int] = []
+        self.last_index = -1
+        self.last_snapshot: Snapshot | None = None
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def intern(self, symbol: typing.Any) -> int:
+        if symbol is None:
+            return NONE_ID
+
+        symbol_id = self.symbols_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.symbols.append(symbol)
+            self.symbols_ids[symbol] = symbol_id
+        return symbol_id
+
+    def symbol(self, symbol_id: int) -> typing.Any:
+        if symbol_id == NONE_ID:
+            return None
+        return self.symbols[symbol_id]
+
+    def log(self, kind: int, target: int, value: int) -> None:
+        self.kinds.append(kind)
+        self.targets.append(target)
+        self.values.append(value)
+
+    # events
+    def node_state(self, v: Node, state: typing.Any) -> None:
+        self.log(NODE_STATE, self.intern(v), self.intern(state))
+
+    def edge_state(self, e: tuple[Node, Node], state: typing.Any) -> None:
+        self.log(EDGE_STATE, self.intern(edge_key(*e)), self.intern(state))
+
+    def text(self, text: str) -> None:
+        self.log(TEXT, NONE_ID, self.intern(text))
+
+    def current(self, v: Node | None) -> None:
+        self.log(CURRENT, self.intern(v), NONE_ID)
+
+    def push(self, v: Node) -> None:
+        self.log(PUSH, self.intern(v), NONE_ID)
+
+    def pop(self, count: int = 1) -> None:
+        self.log(POP, NONE_ID, count)
+
+    def set_graph(self, graph: nx.Graph) -> None:
+        # switches the drawn graph and clears the states, the graph is copied once per switch
+        if graph is self.source:
+            return
+
+        self.source = graph
+        self.graph = nx.freeze(graph.copy())
+        self.symbols.append(self.graph)
+        self.log(GRAPH, NONE_ID, len(self.symbols) - 1)
+
+    def frame(self) -> int:
+        self.frames.append(len(self.kinds))
+        return len(self.frames) - 1
+
+    def events(self) -> typing.Iterator[tuple[int, int, typing.Any, typing.Any]]:
+        # the decoded log as (frame, kind, target, value), for diffing and serializing
+        frame = 0
+        for i in range(len(self.kinds)):
+            while frame < len(self.frames) and self.frames[frame] <= i:
+                frame += 1
+            value = self.values[i] if self.kinds[i] == POP else self.symbol(self.values[i])
+            yield frame, self.kinds[i], self.symbol(self.targets[i]), value
+
+    # fold
+    def apply(self, snapshot: Snapshot, start: int, end: int) -> int:
+        for i in range(start, end):
+            kind = self.kinds[i]
+            if kind == NODE_STATE or kind == EDGE_STATE:
+                states = snapshot.node_states if kind == NODE_STATE else snapshot.edge_states
+                if self.values[i] == NONE_ID:
+                    states.pop(self.symbols[self.targets[i]], None)
+                else:
+                    states[self.symbols[self.targets[i]]] = self.symbols[self.values[i]]
+            elif kind == TEXT:
+                snapshot.text = self.symbols[self.values[i]]
+            elif kind == CURRENT:
+                snapshot.current = self.symbol(self.targets[i])
+            elif kind == PUSH:
+                snapshot.frontier.append(self.symbols[self.targets[i]])
+            elif kind == POP:
+                del snapshot.frontier[-self.values[i]:]
+            elif kind == GRAPH:
+                snapshot.graph = self.symbols[self.values[i]]
+                snapshot.node_states.clear()
+                snapshot.edge_states.clear()
+                snapshot.frontier.clear()
+                snapshot.current = None
+
+        return end - start
+
+    def get(self, index: int) -> Snapshot:
+        if index < 0 or index >= len(self.frames):
+            raise IndexError("frame index out of range")
+
+        if index in self.checkpoints:
+            return self.checkpoints[index].copy()
+
+        # continue from the last folded frame when it is closer than the checkpoint
+        i = bisect.bisect_right(self.checkpoints_indexes, index) - 1
+        checkpoint_index = self.checkpoints_indexes[i] if i >= 0 else -1
+
+        if self.last_snapshot is not None and checkpoint_index <= self.last_index <= index:
+            start = self.last_index
+            snapshot = self.last_snapshot
+        elif checkpoint_index >= 0:
+            start = checkpoint_index
+            snapshot = self.checkpoints[checkpoint_index].copy()
+        else:
+            start = -1
+            snapshot = self.base.copy() if self.base is not None else Snapshot()
+
+        # a checkpoint is added only after the replayed events are as many as the state,
+        # so the checkpoints memory is bounded by the log memory
+        ops = 0
+        for frame in range(start + 1, index + 1):
+            ops += self.apply(snapshot, self.frames[frame - 1] if frame > 0 else 0, self.frames[frame])
+            if ops >= max(self.min_checkpoint_interval, snapshot.size()) and frame not in self.checkpoints:
+                bisect.insort(self.checkpoints_indexes, frame)
+                self.checkpoints[frame] = snapshot.copy()
+                ops = 0
+
+        self.last_index = index
+        self.last_snapshot = snapshot
+
+        return snapshot.copy()
+
+    def state(self) -> Snapshot:
+        # the state after all the events so far
+        if len(self.frames) > 0:
+            snapshot = self.get(len(self.frames) - 1)
+            start = self.frames[-1]
+        else:
+            snapshot = self.base.copy() if self.base is not None else Snapshot()
+            start = 0
+
+        self.apply(snapshot, start, len(self.kinds))
+        return snapshot
+
+    def rebase(self) -> Trace:
+        # a new trace that goes on from the state of this one, so its events are released with the steps that use them
+        return Trace(self.source, self.min_checkpoint_interval, self.state())
+
+    def needs_rebase(self) -> bool:
+        # the events are as many as the state they start from, so rebasing now costs O(1) per event
+        # and the trace of a step is not larger than its own snapshot
+        base_size = self.base.size() if self.base is not None else 0
+        return len(self.kinds) >= max(self.min_checkpoint_interval, base_size)
+
+
+class NullTrace(Trace):
+    # used when the algo is not recorded, all the events are ignored
+    def __init__(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return 0
+
+    def log(self, kind: int, target: int, value: int) -> None:
+        pass
+
+    def intern(self, symbol: typing.Any) -> int:
+        return NONE_ID
+
+    def node_state(self, v: Node, state: typing.Any) -> None:
+        pass
+
+    def edge_state(self, e: tuple[Node, Node], state: typing.Any) -> None:
+        pass
+
+    def text(self, text: str) -> None:
+        pass
+
+    def current(self, v: Node | None) -> None:
+        pass
+
+    def push(self, v: Node) -> None:
+        pass
+
+    def pop(self, count: int = 1) -> None:
+        pass
+
+    def set_graph(self, graph: nx.Graph) -> None:
+        pass
+
+    def frame(self) -> int:
+        return NONE_ID
+
+    def rebase(self) -> Trace:
+        return self
+
+    def needs_rebase(self) -> bool:
+        return False
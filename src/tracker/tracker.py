@@ -1,14 +1,145 @@
 
+from collections import OrderedDict
+from concurrent.futures import Future
+
 from PIL import ImageTk
 
-from src.infra.step import Step
+from src.infra.renderer import GraphRenderer, Size
+from src.infra.step import PlotStep, Step
+from src.tracker.render_pool import RenderPool, result_to_image
+
+
+CompiledStep = tuple[ImageTk.PhotoImage, str]
 
 
 class Tracker:
-    steps: list[tuple[ImageTk.PhotoImage, str]]
+    steps: list[Step]
+    cache: OrderedDict[int, CompiledStep]
+    cache_size: int
+    prefetch_radius: int
+    size: Size | None
+    renderer: GraphRenderer
+    pool: RenderPool | None
+    pending: dict[int, Future]
+    failed: set[int]
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 16, prefetch_radius: int = 1):
         self.steps = []
+        self.cache = OrderedDict()
+        self.cache_size = max(cache_size, 2 * prefetch_radius + 1)
+        self.prefetch_radius = prefetch_radius
+        self.size = None
+        self.renderer = GraphRenderer()
+        self.pool = None
+        self.pending = {}
+        self.failed = set()
 
     def add_step(self, step: Step):
-        self.steps.append(step.compile())
+        self.steps.append(step)
+
+    def step_count(self) -> int:
+        return len(self.steps)
+
+    def has_step(self, index: int) -> bool:
+        return 0 <= index < len(self.steps)
+
+    def load_step(self, index: int) -> Step:
+        return self.steps[index]
+
+    def set_size(self, size: Size) -> None:
+        # the steps are rendered in the size of the display, so there is no rescaling
+        if size != self.size:
+            self.size = size
+            self.cache.clear()
+            self.cancel_pending()
+            self.failed.clear()
+
+    def set_pool(self, pool: RenderPool | None) -> None:
+        self.cancel_pending()
+        self.pool = pool
+
+    def store(self, index: int, compiled: CompiledStep) -> None:
+        self.cache[index] = compiled
+
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def is_ready(self, index: int) -> bool:
+        return index in self.cache
+
+    def get_step(self, index: int) -> CompiledStep:
+        # the steps are compiled only when they are requested, and kept in LRU cache
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return self.cache[index]
+
+        if index in self.pending:
+            future = self.pending.pop(index)
+            if future.done() and not future.cancelled() and future.exception() is None:
+                compiled = result_to_image(future.result())
+                self.store(index, compiled)
+                return compiled
+
+            if future.done():
+                # the render failed or was cancelled in the pool, it is not sent there again
+                self.failed.add(index)
+            else:
+                # the main thread does not wait for the pool, the step is compiled here
+                future.cancel()
+
+        compiled = self.load_step(index).compile(self.size, self.renderer)
+        self.store(index, compiled)
+        return compiled
+
+    def request(self, index: int) -> None:
+        # render the step in the background, only plot steps can be sent to the pool
+        if self.pool is None or index in self.cache or index in self.pending or index in self.failed:
+            return
+
+        step = self.load_step(index)
+        if isinstance(step, PlotStep):
+            self.pending[index] = self.pool.submit(step, self.size)
+
+    def collect(self) -> list[int]:
+        # move the steps that the pool finished into the cache, must be called from the main thread
+        done = [index for index in self.pending if self.pending[index].done()]
+        for index in done:
+            future = self.pending.pop(index)
+            # a failed render is not sent to the pool again, get_step compiles it in the main thread
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                self.failed.add(index)
+                continue
+            self.store(index, result_to_image(future.result()))
+
+        return done
+
+    def prefetch(self, index: int) -> None:
+        if self.pool is not None:
+            for i in range(max(index - self.prefetch_radius, 0), index + self.cache_size // 2):
+                if self.has_step(i):
+                    self.request(i)
+            return
+
+        for i in range(index - self.prefetch_radius, index + self.prefetch_radius + 1):
+            if self.has_step(i) and i not in self.cache:
+                self.get_step(i)
+
+        # keep the current step as the most recently used
+        if index in self.cache:
+            self.cache.move_to_end(index)
+
+    def cancel_pending(self) -> None:
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def clear_cache(self) -> None:
+        self.cache.clear()
+        self.cancel_pending()
+        self.failed.clear()
+        self.renderer.clear()
+
+    def close(self) -> None:
+        self.clear_cache()